@@ -1,167 +1,357 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import re
-from collections import defaultdict
-
-def analyze_results():
-    """Анализ результатов проверки"""
-    
-    with open('result.md', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Извлечение статистики
-    stats_match = re.search(r'Всего сайтов: (\d+)\n- Доступных сайтов: (\d+)\n- Недоступных сайтов: (\d+)', content)
-    total_sites = int(stats_match.group(1))
-    accessible_sites = int(stats_match.group(2))
-    inaccessible_sites = int(stats_match.group(3))
-    
-    # Поиск всех результатов соответствия
-    compliance_pattern = r'Соответствие: (\d+)/(\d+) \((\d+\.\d+)%\)'
-    compliance_matches = re.findall(compliance_pattern, content)
-    
+import argparse
+import os
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from check_registry import check_labels
+from result_store import DEFAULT_RESULTS_FILE, read_results
+from timings import TimingStats
+
+# Границы уровней соответствия (%): плохо, удовлетворительно, хорошо, отлично
+LEVEL_BOUNDS = [40, 60, 80]
+
+# Перцентили соответствия в резюме
+SCORE_PERCENTILES = [10, 25, 50, 75, 90]
+
+# Число пар критериев в разделе совместных невыполнений
+TOP_CO_FAILURES = 5
+
+# Число сторонних сервисов в разделе распространенности
+TOP_SERVICES = 15
+
+RECOMMENDATIONS = {
+    'cookie_categories': 'Внедрить разделение cookie на обязательные и прочие категории с возможностью выбора пользователем',
+    'rkn_registration': 'Проверить необходимость регистрации в РКН как оператора персональных данных',
+    'cookie_popup': 'Добавить всплывающее окно с информацией о cookie-файлах',
+    'pd_consent_checkboxes': 'Добавить чекбоксы согласия на обработку персональных данных во все формы',
+    'third_party_audit': 'Провести аудит взаимодействия со сторонними сервисами и документировать его результаты',
+    'pd_storage_russia': 'Убедиться, что персональные данные хранятся на серверах в РФ',
+    'data_subject_email': 'Добавить контактную информацию для обращений субъектов персональных данных',
+    'privacy_policy': 'Разработать и опубликовать актуальную политику конфиденциальности',
+    'consent_logging': 'Реализовать систему логирования согласий пользователей',
+    'checkbox_not_checked': 'Убедиться, что чекбоксы согласия не отмечены по умолчанию'
+}
+
+# Итоговые показатели запуска для таблицы динамики
+RunSummary = namedtuple('RunSummary', ['name', 'total_sites', 'accessible_sites', 'mean', 'median', 'rates'])
+
+
+class ResultMatrix:
+    """Результаты одного запуска в виде матриц сайты x критерии
+
+    passed  - критерий выполнен
+    present - критерий проверялся (есть в checks)
+    Строки соответствуют доступным сайтам в порядке файла результатов.
+    services - число доступных сайтов с каждым сторонним сервисом
+    """
+
+    def __init__(self, keys, total_sites, sites, passed, present, order, services=None, not_html_sites=0):
+        self.keys = keys
+        self.total_sites = total_sites
+        self.sites = sites
+        self.passed = passed
+        self.present = present
+        self.order = order
+        self.services = services if services is not None else Counter()
+        self.not_html_sites = not_html_sites
+
+    @classmethod
+    def load(cls, results_file, keys, timing_stats=None):
+        """Загрузка файла результатов за один проход; строки копятся в байтовых буферах"""
+        columns = {key: column for column, key in enumerate(keys)}
+        width = len(keys)
+        total_sites = 0
+        sites = []
+        order = []
+        passed = bytearray()
+        present = bytearray()
+        services = Counter()
+        not_html_sites = 0
+        for record in read_results(results_file):
+            total_sites += 1
+            if timing_stats is not None:
+                timing_stats.add(record)
+            if not record['accessible']:
+                continue
+            # Не HTML-страница доступна, но критерии для нее не проверялись
+            not_html_sites += 1 if record.get('not_html') else 0
+
+            passed_row = bytearray(width)
+            present_row = bytearray(width)
+            for key, value in record['checks'].items():
+                column = columns.get(key)
+                if column is not None:
+                    present_row[column] = 1
+                    passed_row[column] = 1 if value else 0
+            passed += passed_row
+            present += present_row
+            sites.append(record['site'])
+            order.append(record.get('index', total_sites))
+            services.update(record.get('services', ()))
+
+        rows = len(sites)
+        return cls(keys, total_sites, sites,
+                   np.frombuffer(bytes(passed), dtype=bool).reshape(rows, width),
+                   np.frombuffer(bytes(present), dtype=bool).reshape(rows, width),
+                   np.asarray(order, dtype=np.int64), services, not_html_sites)
+
+    @property
+    def accessible_sites(self):
+        return len(self.sites)
+
+    def criteria_counts(self):
+        """Число выполнений и проверок каждого критерия"""
+        passed = (self.passed & self.present).sum(axis=0)
+        total = self.present.sum(axis=0)
+        return passed, total
+
+    def criteria_rates(self):
+        """Процент выполнения критериев (NaN для непроверявшихся)"""
+        passed, total = self.criteria_counts()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total > 0, passed / total * 100, np.nan)
+
+    def site_scores(self):
+        """Процент соответствия сайтов, у которых проверялся хотя бы один критерий
+
+        Возвращает номера строк и проценты, округленные до десятых.
+        """
+        total = self.present.sum(axis=1)
+        rows = np.flatnonzero(total > 0)
+        passed = (self.passed & self.present)[rows].sum(axis=1)
+        return rows, np.round(passed / total[rows] * 100, 1)
+
+    def co_failures(self):
+        """Совместные невыполнения пар критериев
+
+        Для каждой пары среди сайтов, где проверялись оба критерия, считается
+        число сайтов, не выполнивших оба, и коэффициент корреляции (phi)
+        признаков невыполнения.
+        """
+        present = self.present.astype(np.float64)
+        failed = (self.present & ~self.passed).astype(np.float64)
+        both_present = present.T @ present
+        both_failed = failed.T @ failed
+        # Невыполнения первого критерия среди сайтов, где проверялся второй, и наоборот
+        failed_first = failed.T @ present
+        failed_second = present.T @ failed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            numerator = both_failed * both_present - failed_first * failed_second
+            denominator = np.sqrt(failed_first * (both_present - failed_first)
+                                  * failed_second * (both_present - failed_second))
+            phi = np.where(denominator > 0, numerator / denominator, np.nan)
+        return both_failed.astype(np.int64), phi
+
+    def summary(self, name):
+        """Итоговые показатели запуска"""
+        _, scores = self.site_scores()
+        mean = scores.mean() if scores.size else np.nan
+        median = np.median(scores) if scores.size else np.nan
+        return RunSummary(name, self.total_sites, self.accessible_sites, mean, median,
+                          self.criteria_rates())
+
+
+def write_summary(f, matrix, criteria_names, timing_stats=None):
+    """Краткое резюме одного запуска"""
+    keys = matrix.keys
+    total_sites = matrix.total_sites
+    accessible_sites = matrix.accessible_sites
+    inaccessible_sites = total_sites - accessible_sites
+    rows, scores = matrix.site_scores()
+
+    f.write("# Краткое резюме проверки сайтов на соответствие требованиям к обработке ПДн\n\n")
+
+    f.write("## Общая статистика\n\n")
+    f.write(f"- **Всего проверено сайтов:** {total_sites}\n")
+    # Пустой файл результатов (например, пустой шард) - резюме без статистики
+    if not total_sites:
+        f.write("\nНет результатов проверки.\n")
+        return
+    f.write(f"- **Доступных сайтов:** {accessible_sites} ({accessible_sites/total_sites*100:.1f}%)\n")
+    if matrix.not_html_sites:
+        f.write(f"- **Из них не HTML-страниц (PDF, изображения, файлы):** {matrix.not_html_sites}\n")
+    f.write(f"- **Недоступных сайтов:** {inaccessible_sites} ({inaccessible_sites/total_sites*100:.1f}%)\n")
+    f.write("\n")
+
+    # Статистика соответствия
+    if scores.size:
+        f.write("## Статистика соответствия\n\n")
+        f.write(f"- **Среднее соответствие:** {scores.mean():.1f}%\n")
+        f.write(f"- **Максимальное соответствие:** {scores.max():.1f}%\n")
+        f.write(f"- **Минимальное соответствие:** {scores.min():.1f}%\n\n")
+
+        # Распределение по уровням соответствия
+        poor, fair, good, excellent = np.bincount(np.digitize(scores, LEVEL_BOUNDS), minlength=4)
+
+        f.write("### Распределение по уровням соответствия\n\n")
+        f.write(f"- **Отлично (80-100%):** {excellent} сайтов ({excellent/scores.size*100:.1f}%)\n")
+        f.write(f"- **Хорошо (60-79%):** {good} сайтов ({good/scores.size*100:.1f}%)\n")
+        f.write(f"- **Удовлетворительно (40-59%):** {fair} сайтов ({fair/scores.size*100:.1f}%)\n")
+        f.write(f"- **Плохо (0-39%):** {poor} сайтов ({poor/scores.size*100:.1f}%)\n\n")
+
+        f.write("### Перцентили соответствия\n\n")
+        values = np.percentile(scores, SCORE_PERCENTILES)
+        f.write(" | ".join(f"p{p}: {value:.1f}%" for p, value in zip(SCORE_PERCENTILES, values)) + "\n\n")
+
     # Анализ по критериям
-    criteria_stats = defaultdict(int)
-    criteria_names = {
-        'privacy_policy': '1. Политика конфиденциальности',
-        'pd_consent_checkboxes': '2. Чекбоксы согласия на обработку ПДн',
-        'checkbox_not_checked': '3. Чекбокс не отмечен по умолчанию',
-        'consent_logging': '4. Фиксация согласия (логирование)',
-        'cookie_popup': '5. Всплывающее окно о cookie',
-        'cookie_categories': '6. Разделение cookie на категории',
-        'pd_storage_russia': '7. Хранение ПДн на территории РФ',
-        'rkn_registration': '8. Регистрация в РКН',
-        'data_subject_email': '9. Email для обращений субъектов данных',
-        'third_party_audit': '10. Аудит сторонних сервисов'
-    }
-    
-    # Поиск статусов по каждому критерию
-    for i, (criteria_key, criteria_name) in enumerate(criteria_names.items(), 1):
-        pattern = rf'{re.escape(criteria_name)} \| (✅|❌)'
-        matches = re.findall(pattern, content)
-        criteria_stats[criteria_key] = {
-            'passed': matches.count('✅'),
-            'failed': matches.count('❌'),
-            'total': len(matches)
-        }
-    
-    # Создание краткого резюме
-    with open('summary.md', 'w', encoding='utf-8') as f:
-        f.write("# Краткое резюме проверки сайтов на соответствие требованиям к обработке ПДн\n\n")
-        
-        f.write("## Общая статистика\n\n")
-        f.write(f"- **Всего проверено сайтов:** {total_sites}\n")
-        f.write(f"- **Доступных сайтов:** {accessible_sites} ({accessible_sites/total_sites*100:.1f}%)\n")
-        f.write(f"- **Недоступных сайтов:** {inaccessible_sites} ({inaccessible_sites/total_sites*100:.1f}%)\n\n")
-        
-        # Статистика соответствия
-        if compliance_matches:
-            compliance_scores = [float(match[2]) for match in compliance_matches]
-            avg_compliance = sum(compliance_scores) / len(compliance_scores)
-            max_compliance = max(compliance_scores)
-            min_compliance = min(compliance_scores)
-            
-            f.write("## Статистика соответствия\n\n")
-            f.write(f"- **Среднее соответствие:** {avg_compliance:.1f}%\n")
-            f.write(f"- **Максимальное соответствие:** {max_compliance:.1f}%\n")
-            f.write(f"- **Минимальное соответствие:** {min_compliance:.1f}%\n\n")
-            
-            # Распределение по уровням соответствия
-            excellent = len([s for s in compliance_scores if s >= 80])
-            good = len([s for s in compliance_scores if 60 <= s < 80])
-            fair = len([s for s in compliance_scores if 40 <= s < 60])
-            poor = len([s for s in compliance_scores if s < 40])
-            
-            f.write("### Распределение по уровням соответствия\n\n")
-            f.write(f"- **Отлично (80-100%):** {excellent} сайтов ({excellent/len(compliance_scores)*100:.1f}%)\n")
-            f.write(f"- **Хорошо (60-79%):** {good} сайтов ({good/len(compliance_scores)*100:.1f}%)\n")
-            f.write(f"- **Удовлетворительно (40-59%):** {fair} сайтов ({fair/len(compliance_scores)*100:.1f}%)\n")
-            f.write(f"- **Плохо (0-39%):** {poor} сайтов ({poor/len(compliance_scores)*100:.1f}%)\n\n")
-        
-        # Анализ по критериям
-        f.write("## Анализ по критериям\n\n")
-        f.write("| Критерий | Выполнено | Не выполнено | Процент выполнения |\n")
-        f.write("|----------|-----------|--------------|-------------------|\n")
-        
-        for criteria_key, criteria_name in criteria_names.items():
-            stats = criteria_stats[criteria_key]
-            if stats['total'] > 0:
-                percentage = (stats['passed'] / stats['total']) * 100
-                f.write(f"| {criteria_name} | {stats['passed']} | {stats['failed']} | {percentage:.1f}% |\n")
-        
+    passed, total = matrix.criteria_counts()
+    rates = matrix.criteria_rates()
+    checked = np.flatnonzero(total > 0)
+    f.write("## Анализ по критериям\n\n")
+    f.write("| Критерий | Выполнено | Не выполнено | Процент выполнения |\n")
+    f.write("|----------|-----------|--------------|-------------------|\n")
+
+    for column in checked:
+        f.write(f"| {criteria_names[keys[column]]} | {passed[column]} | {total[column] - passed[column]} | "
+                f"{rates[column]:.1f}% |\n")
+
+    f.write("\n")
+
+    # Распространенность сторонних сервисов
+    if matrix.services:
+        f.write("## Сторонние сервисы\n\n")
+        f.write("| Сервис | Сайтов | Доля доступных сайтов |\n")
+        f.write("|--------|--------|-----------------------|\n")
+        for service, count in matrix.services.most_common(TOP_SERVICES):
+            f.write(f"| {service} | {count} | {count/accessible_sites*100:.1f}% |\n")
         f.write("\n")
-        
-        # Топ-5 лучших сайтов
-        f.write("## Топ-5 сайтов с наилучшим соответствием\n\n")
-        site_compliance = []
-        
-        # Поиск сайтов и их соответствия
-        site_pattern = r'### (https?://[^\n]+)\n\n.*?Соответствие: (\d+)/(\d+) \((\d+\.\d+)%\)'
-        site_matches = re.findall(site_pattern, content, re.DOTALL)
-        
-        for match in site_matches:
-            site_url = match[0]
-            percentage = float(match[3])
-            site_compliance.append((site_url, percentage))
-        
-        # Сортировка по убыванию соответствия
-        site_compliance.sort(key=lambda x: x[1], reverse=True)
-        
-        for i, (site_url, percentage) in enumerate(site_compliance[:5], 1):
-            f.write(f"{i}. **{site_url}** - {percentage:.1f}%\n")
-        
+
+    # Топ-5 лучших сайтов
+    f.write("## Топ-5 сайтов с наилучшим соответствием\n\n")
+
+    # Сортировка по убыванию соответствия (при равенстве - в порядке входного списка)
+    best = np.lexsort((matrix.order[rows], -scores))[:5]
+    for i, position in enumerate(best, 1):
+        f.write(f"{i}. **{matrix.sites[rows[position]]}** - {scores[position]:.1f}%\n")
+
+    f.write("\n")
+
+    # Основные проблемы
+    f.write("## Основные проблемы\n\n")
+
+    # Критерии с наименьшим процентом выполнения (при равенстве - в порядке реестра)
+    worst = checked[np.argsort(rates[checked], kind='stable')]
+
+    f.write("### Критерии с наименьшим процентом выполнения:\n\n")
+    for column in worst[:3]:
+        f.write(f"- **{criteria_names[keys[column]]}** - {rates[column]:.1f}%\n")
+
+    f.write("\n")
+
+    # Пары критериев, которые чаще всего не выполняются вместе
+    both_failed, phi = matrix.co_failures()
+    first, second = np.triu_indices(len(keys), k=1)
+    pairs = np.flatnonzero(~np.isnan(phi[first, second]) & (both_failed[first, second] > 0))
+    if pairs.size:
+        pairs = pairs[np.argsort(-phi[first[pairs], second[pairs]], kind='stable')][:TOP_CO_FAILURES]
+        f.write("### Критерии, которые чаще не выполняются вместе:\n\n")
+        for pair in pairs:
+            i, j = first[pair], second[pair]
+            f.write(f"- **{criteria_names[keys[i]]}** и **{criteria_names[keys[j]]}** - "
+                    f"{both_failed[i, j]} сайтов, корреляция {phi[i, j]:.2f}\n")
         f.write("\n")
-        
-        # Основные проблемы
-        f.write("## Основные проблемы\n\n")
-        
-        # Находим критерии с наименьшим процентом выполнения
-        criteria_percentages = []
-        for criteria_key, criteria_name in criteria_names.items():
-            stats = criteria_stats[criteria_key]
-            if stats['total'] > 0:
-                percentage = (stats['passed'] / stats['total']) * 100
-                criteria_percentages.append((criteria_name, percentage))
-        
-        criteria_percentages.sort(key=lambda x: x[1])
-        
-        f.write("### Критерии с наименьшим процентом выполнения:\n\n")
-        for criteria_name, percentage in criteria_percentages[:3]:
-            f.write(f"- **{criteria_name}** - {percentage:.1f}%\n")
-        
+
+    # Рекомендации
+    f.write("## Рекомендации\n\n")
+    f.write("### Приоритетные направления для улучшения:\n\n")
+
+    for column in worst[:5]:
+        key = keys[column]
+        if key in RECOMMENDATIONS:
+            f.write(f"- **{criteria_names[key]}** ({rates[column]:.1f}%): {RECOMMENDATIONS[key]}\n")
+
+    f.write("\n")
+    f.write("### Общие рекомендации:\n\n")
+    f.write("1. **Провести комплексный аудит** соответствия требованиям 152-ФЗ\n")
+    f.write("2. **Разработать план мероприятий** по приведению в соответствие\n")
+    f.write("3. **Назначить ответственного** за обработку персональных данных\n")
+    f.write("4. **Провести обучение персонала** по вопросам защиты персональных данных\n")
+    f.write("5. **Регулярно проводить мониторинг** соответствия требованиям\n")
+
+    # Время этапов проверки
+    if timing_stats is not None and timing_stats.phases:
         f.write("\n")
-        
-        # Рекомендации
-        f.write("## Рекомендации\n\n")
-        f.write("### Приоритетные направления для улучшения:\n\n")
-        
-        recommendations = {
-            'cookie_categories': 'Внедрить разделение cookie на обязательные и прочие категории с возможностью выбора пользователем',
-            'rkn_registration': 'Проверить необходимость регистрации в РКН как оператора персональных данных',
-            'cookie_popup': 'Добавить всплывающее окно с информацией о cookie-файлах',
-            'pd_consent_checkboxes': 'Добавить чекбоксы согласия на обработку персональных данных во все формы',
-            'third_party_audit': 'Провести аудит взаимодействия со сторонними сервисами и документировать его результаты',
-            'pd_storage_russia': 'Убедиться, что персональные данные хранятся на серверах в РФ',
-            'data_subject_email': 'Добавить контактную информацию для обращений субъектов персональных данных',
-            'privacy_policy': 'Разработать и опубликовать актуальную политику конфиденциальности',
-            'consent_logging': 'Реализовать систему логирования согласий пользователей',
-            'checkbox_not_checked': 'Убедиться, что чекбоксы согласия не отмечены по умолчанию'
-        }
-        
-        for criteria_name, percentage in criteria_percentages[:5]:
-            criteria_key = next(k for k, v in criteria_names.items() if v == criteria_name)
-            if criteria_key in recommendations:
-                f.write(f"- **{criteria_name}** ({percentage:.1f}%): {recommendations[criteria_key]}\n")
-        
+        timing_stats.write_markdown(f, criteria_names)
+
+
+def write_trend(f, runs, criteria_names):
+    """Динамика по нескольким запускам: показатели и процент выполнения критериев"""
+    keys = list(criteria_names)
+    rates = np.vstack([run.rates for run in runs])
+
+    f.write("\n## Динамика по запускам\n\n")
+    f.write("| Запуск | Сайтов | Доступных | Среднее соответствие | Медиана |\n")
+    f.write("|--------|--------|-----------|----------------------|---------|\n")
+    for run in runs:
+        mean = "-" if np.isnan(run.mean) else f"{run.mean:.1f}%"
+        median = "-" if np.isnan(run.median) else f"{run.median:.1f}%"
+        f.write(f"| {run.name} | {run.total_sites} | {run.accessible_sites} | {mean} | {median} |\n")
+    f.write("\n")
+
+    # В заголовке таблицы - номера критериев (названия начинаются с номера)
+    columns = np.flatnonzero(~np.isnan(rates).all(axis=0))
+    f.write("### Процент выполнения критериев\n\n")
+    f.write("| Запуск | " + " | ".join(criteria_names[keys[c]].split('.')[0] for c in columns) + " |\n")
+    f.write("|--------|" + "---|" * len(columns) + "\n")
+    for run, row in zip(runs, rates[:, columns]):
+        cells = ["-" if np.isnan(value) else f"{value:.1f}" for value in row]
+        f.write(f"| {run.name} | " + " | ".join(cells) + " |\n")
+    f.write("\n")
+
+    # Изменение процента выполнения между первым и последним запуском
+    change = rates[-1] - rates[0]
+    changed = [c for c in columns if not np.isnan(change[c]) and change[c] != 0]
+    if changed:
+        f.write(f"### Изменения с {runs[0].name} по {runs[-1].name}\n\n")
+        for column in sorted(changed, key=lambda c: change[c]):
+            f.write(f"- **{criteria_names[keys[column]]}**: {change[column]:+.1f} п.п.\n")
         f.write("\n")
-        f.write("### Общие рекомендации:\n\n")
-        f.write("1. **Провести комплексный аудит** соответствия требованиям 152-ФЗ\n")
-        f.write("2. **Разработать план мероприятий** по приведению в соответствие\n")
-        f.write("3. **Назначить ответственного** за обработку персональных данных\n")
-        f.write("4. **Провести обучение персонала** по вопросам защиты персональных данных\n")
-        f.write("5. **Регулярно проводить мониторинг** соответствия требованиям\n")
-    
-    print("Анализ завершен! Краткое резюме сохранено в summary.md")
+
+
+def analyze_results(results_files=DEFAULT_RESULTS_FILE, output_file='summary.md'):
+    """Анализ результатов проверки
+
+    Принимает файл результатов или список файлов нескольких запусков в
+    хронологическом порядке. Резюме строится по последнему запуску, для
+    нескольких запусков добавляется динамика показателей.
+    """
+    if isinstance(results_files, str):
+        results_files = [results_files]
+
+    criteria_names = check_labels()
+    keys = list(criteria_names)
+
+    # От предыдущих запусков в памяти остаются только итоговые показатели
+    runs = []
+    for results_file in results_files[:-1]:
+        matrix = ResultMatrix.load(results_file, keys)
+        runs.append(matrix.summary(os.path.basename(results_file)))
+
+    timing_stats = TimingStats()
+    latest = ResultMatrix.load(results_files[-1], keys, timing_stats)
+    runs.append(latest.summary(os.path.basename(results_files[-1])))
+
+    # Создание краткого резюме
+    with open(output_file, 'w', encoding='utf-8') as f:
+        write_summary(f, latest, criteria_names, timing_stats)
+        if len(runs) > 1:
+            write_trend(f, runs, criteria_names)
+
+    print(f"Анализ завершен! Краткое резюме сохранено в {output_file}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Анализ результатов проверки сайтов')
+    parser.add_argument('results_files', nargs='*', default=[DEFAULT_RESULTS_FILE],
+                        help='файлы результатов в формате JSONL; несколько файлов - запуски в '
+                             f'хронологическом порядке (по умолчанию {DEFAULT_RESULTS_FILE})')
+    parser.add_argument('-o', '--output', default='summary.md',
+                        help='файл резюме (по умолчанию summary.md)')
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    analyze_results() 
\ No newline at end of file
+    args = parse_args()
+    analyze_results(args.results_files, args.output)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Сравнение скорости поиска ключевых слов: вложенные циклы, KeywordMatcher
+и объединенное регулярное выражение
+
+Использование:
+    python3 benchmarks/bench_keywords.py <каталог с сохраненными страницами> [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from check_sites import KEYWORDS, KEYWORD_MATCHER
+
+# Категории, которые проверяются по полному тексту страницы
+PAGE_CATEGORIES = [
+    'consent_logging', 'cookie_categories', 'pd_storage_russia',
+    'rkn_registration', 'data_subject', 'third_party_audit'
+]
+
+
+def legacy_scan(text):
+    """Поиск как в прежних check_*: отдельный проход по тексту для каждого слова"""
+    result = {}
+    for category in PAGE_CATEGORIES:
+        if category == 'cookie_categories':
+            result[category] = sum(1 for keyword in KEYWORDS[category] if keyword in text) >= 2
+            continue
+        found = False
+        for keyword in KEYWORDS[category]:
+            if keyword in text:
+                found = True
+                break
+        result[category] = found
+    return result
+
+
+def matcher_scan(text):
+    """Поиск через KeywordMatcher с общим кэшем по словам"""
+    matches = KEYWORD_MATCHER.scan(text)
+    result = {}
+    for category in PAGE_CATEGORIES:
+        if category == 'cookie_categories':
+            result[category] = matches.count(category, limit=2) >= 2
+        else:
+            result[category] = matches.any(category)
+    return result
+
+
+def _build_regex():
+    """Одно регулярное выражение для всех слов с учетом перекрывающихся вхождений"""
+    keywords = sorted({keyword for category in PAGE_CATEGORIES for keyword in KEYWORDS[category]},
+                      key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in keywords) + '))')
+    prefixes = {keyword: [other for other in keywords if keyword.startswith(other)] for keyword in keywords}
+    return pattern, prefixes
+
+
+REGEX, REGEX_PREFIXES = _build_regex()
+
+
+def regex_scan(text):
+    """Поиск всех слов одним проходом регулярного выражения"""
+    found = set()
+    for keyword in set(REGEX.findall(text)):
+        found.update(REGEX_PREFIXES[keyword])
+    result = {}
+    for category in PAGE_CATEGORIES:
+        matched = found.intersection(KEYWORDS[category])
+        result[category] = len(matched) >= 2 if category == 'cookie_categories' else bool(matched)
+    return result
+
+
+def load_texts(corpus_dir):
+    """Текст страниц корпуса в нижнем регистре"""
+    texts = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.endswith(('.html', '.htm')):
+            continue
+        with open(os.path.join(corpus_dir, name), 'rb') as f:
+            texts.append((name, BeautifulSoup(f.read(), 'html.parser').get_text().lower()))
+    return texts
+
+
+def measure(scan, texts, repeat):
+    """Лучшее время обработки всего корпуса из repeat повторов"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _, text in texts:
+            scan(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Микробенчмарк поиска ключевых слов')
+    parser.add_argument('corpus_dir', help='каталог с сохраненными HTML-страницами')
+    parser.add_argument('--repeat', type=int, default=5, help='число повторов (по умолчанию 5)')
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus_dir)
+    if not texts:
+        print(f"В каталоге {args.corpus_dir} нет HTML-страниц")
+        return
+
+    mismatches = [
+        name for name, text in texts
+        if not legacy_scan(text) == matcher_scan(text) == regex_scan(text)
+    ]
+    total_chars = sum(len(text) for _, text in texts)
+
+    legacy_time = measure(legacy_scan, texts, args.repeat)
+    matcher_time = measure(matcher_scan, texts, args.repeat)
+    regex_time = measure(regex_scan, texts, args.repeat)
+
+    print(f"Страниц: {len(texts)}, символов текста: {total_chars}")
+    print(f"Вложенные циклы: {legacy_time * 1000:.2f} мс")
+    print(f"KeywordMatcher:  {matcher_time * 1000:.2f} мс")
+    print(f"Регулярное выражение: {regex_time * 1000:.2f} мс")
+    if mismatches:
+        print(f"Расхождения в результатах: {', '.join(mismatches)}")
+    else:
+        print("Результаты совпадают")
+
+
+if __name__ == "__main__":
+    main()
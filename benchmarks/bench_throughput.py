@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Замер пропускной способности проверки сайтов на локальном корпусе
+
+Корпус страниц (сгенерированный corpus.py или каталог сохраненных страниц)
+отдается локальным сервером stub_server.py. SiteChecker запускается в каждом
+режиме в отдельном процессе; для режима выводятся сайты в секунду, процессорное
+время и пиковое потребление памяти. Результаты проверок всех режимов сравниваются
+с результатами первого режима.
+
+Режимы:
+    sequential - один поток
+    threads    - параллельная загрузка в потоках (--workers)
+    processes  - потоки и разбор страниц в пуле процессов (--processes)
+
+Использование:
+    python3 benchmarks/bench_throughput.py [--corpus КАТАЛОГ] [--count N] [--modes sequential,threads]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_corpus
+from stub_server import StubServer
+
+MODES = ['sequential', 'threads', 'processes']
+
+
+def checker_options(mode, args):
+    """Параметры SiteChecker для режима"""
+    options = {'host_delay': 0, 'retries': 0, 'read_timeout': args.read_timeout,
+               'connect_timeout': args.read_timeout}
+    if mode != 'sequential':
+        options['max_workers'] = args.workers
+    if mode == 'processes':
+        options['processes'] = args.processes
+    return options
+
+
+def run_child(mode, sites_file, results_file, options):
+    """Проверка сайтов в текущем процессе (вызывается в дочернем процессе)"""
+    import logging
+    from check_sites import SiteChecker
+
+    # Ошибки загрузки страниц timeout_ ожидаемы
+    logging.disable(logging.ERROR)
+    checker = SiteChecker(**options)
+    try:
+        checker.check_all_sites(sites_file, results_file)
+    finally:
+        checker.close()
+
+
+def run_mode(mode, sites_file, results_file, args):
+    """Запуск режима в отдельном процессе; время работы и ресурсы процесса"""
+    command = [sys.executable, os.path.abspath(__file__), '--child', mode,
+               '--child-sites', sites_file, '--child-results', results_file,
+               '--child-options', json.dumps(checker_options(mode, args))]
+    started = time.perf_counter()
+    process = subprocess.Popen(command)
+    # wait4 возвращает ресурсы процесса вместе с завершенными дочерними процессами
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+    # Процесс уже завершен, повторно его ожидать не нужно
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f"Режим {mode} завершился с кодом {process.returncode}")
+    return {
+        'elapsed': elapsed,
+        'cpu': usage.ru_utime + usage.ru_stime,
+        # В Linux ru_maxrss в килобайтах
+        'max_rss_mb': usage.ru_maxrss / 1024,
+    }
+
+
+def load_checks(results_file):
+    """Результаты проверок по сайтам"""
+    checks = {}
+    with open(results_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                checks[record['site']] = record['checks']
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер пропускной способности проверки сайтов')
+    parser.add_argument('--corpus', help='каталог с HTML-страницами (по умолчанию генерируется синтетический корпус)')
+    parser.add_argument('--count', type=int, default=200, help='число страниц синтетического корпуса (по умолчанию 200)')
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help=f'режимы через запятую (по умолчанию {",".join(MODES)})')
+    parser.add_argument('--workers', type=int, default=16, help='число потоков (по умолчанию 16)')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help='число процессов разбора (по умолчанию число ядер)')
+    parser.add_argument('--read-timeout', type=float, default=2.0,
+                        help='таймаут проверки, сек; страницы timeout_ его превышают (по умолчанию 2)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--child-sites', help=argparse.SUPPRESS)
+    parser.add_argument('--child-results', help=argparse.SUPPRESS)
+    parser.add_argument('--child-options', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.child_sites, args.child_results, json.loads(args.child_options))
+        return
+
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"неизвестные режимы: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus_dir = args.corpus
+        if not corpus_dir:
+            corpus_dir = os.path.join(work_dir, 'corpus')
+            generate_corpus(corpus_dir, args.count)
+        names = sorted(name for name in os.listdir(corpus_dir) if name.endswith(('.html', '.htm')))
+        if not names:
+            print(f"В каталоге {corpus_dir} нет HTML-страниц")
+            return
+
+        # Сервер отвечает на страницах timeout_ дольше таймаута проверки
+        with StubServer(corpus_dir, hang_delay=args.read_timeout * 3) as server:
+            sites_file = os.path.join(work_dir, 'sites.txt')
+            with open(sites_file, 'w', encoding='utf-8') as f:
+                for name in names:
+                    f.write(f"{server.base_url}/{name}\n")
+
+            print(f"Страниц: {len(names)}")
+            print(f"{'Режим':<12} {'Время, с':>9} {'Сайтов/с':>9} {'CPU, с':>8} {'Память, МБ':>11}")
+            reference = None
+            mismatches = {}
+            for mode in modes:
+                results_file = os.path.join(work_dir, f'{mode}.jsonl')
+                stats = run_mode(mode, sites_file, results_file, args)
+                print(f"{mode:<12} {stats['elapsed']:>9.2f} {len(names) / stats['elapsed']:>9.1f} "
+                      f"{stats['cpu']:>8.2f} {stats['max_rss_mb']:>11.1f}")
+
+                checks = load_checks(results_file)
+                if reference is None:
+                    reference = checks
+                else:
+                    differing = [site for site in reference if checks.get(site) != reference[site]]
+                    if differing:
+                        mismatches[mode] = differing
+
+    if mismatches:
+        for mode, sites in mismatches.items():
+            print(f"Результаты режима {mode} отличаются от {modes[0]} для {len(sites)} сайтов: "
+                  f"{', '.join(sites[:5])}")
+        sys.exit(1)
+    print("Результаты проверок во всех режимах совпадают")
+
+
+if __name__ == "__main__":
+    main()
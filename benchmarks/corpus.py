@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Генерация синтетического корпуса страниц для замеров производительности
+
+Виды страниц (по префиксу имени файла):
+    small_   - небольшая страница с частью признаков
+    large_   - большая страница (около 2 МБ текста)
+    forms_   - страница с множеством форм и чекбоксов
+    cookie_  - страница с окном о cookie и категориями
+    slow_    - обычная страница, которую stub_server.py отдает с задержкой
+    timeout_ - страница, на которой stub_server.py не отвечает дольше таймаута
+
+Использование:
+    python3 benchmarks/corpus.py <каталог> [--count N] [--seed N]
+"""
+
+import argparse
+import os
+import random
+
+# Доля страниц каждого вида в корпусе
+KINDS = [
+    ('small', 40),
+    ('large', 5),
+    ('forms', 20),
+    ('cookie', 25),
+    ('slow', 7),
+    ('timeout', 3),
+]
+
+PARAGRAPHS = [
+    'Мы обрабатываем персональные данные в соответствии с законодательством Российской Федерации.',
+    'Данные хранятся на серверах, расположенных на территории РФ.',
+    'Компания зарегистрирована в реестре операторов персональных данных Роскомнадзора.',
+    'Фиксация согласия: сохраняются дата, время и IP-адрес пользователя.',
+    'Для обращений субъектов данных пишите на privacy@example.ru.',
+    'Регулярно проводится аудит сторонних сервисов, используемых на сайте.',
+    'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.',
+    'Наша компания предлагает широкий ассортимент товаров и услуг для бизнеса.',
+    'Доставка осуществляется по всей стране в течение трех рабочих дней.',
+    'Свяжитесь с нами по телефону или через форму обратной связи.',
+]
+
+SCRIPTS = [
+    'https://www.googletagmanager.com/gtag/js?id=G-TEST',
+    'https://mc.yandex.ru/metrika/tag.js',
+    'https://connect.facebook.net/en_US/fbevents.js',
+    '/static/app.js',
+]
+
+LINKS = [
+    ('Политика конфиденциальности', '/privacy'),
+    ('Контакты', '/contacts'),
+    ('О компании', '/about'),
+    ('Каталог', '/catalog'),
+]
+
+
+def _form(rng, index):
+    """Форма с полями и, возможно, чекбоксом согласия"""
+    fields = [f'<input type="text" name="name{index}">', f'<input type="email" name="email{index}">']
+    if rng.random() < 0.7:
+        checked = ' checked="checked"' if rng.random() < 0.3 else ''
+        fields.append(
+            f'<input type="checkbox" id="agree{index}" name="agree{index}"{checked}>'
+            f'<label for="agree{index}">Я согласен на обработку персональных данных</label>'
+        )
+    return f'<form action="/send">{"".join(fields)}<button>Отправить</button></form>'
+
+
+def _cookie_banner(rng):
+    """Окно о cookie, иногда с выбором категорий"""
+    categories = ''
+    if rng.random() < 0.6:
+        categories = ('<label><input type="checkbox" checked disabled> Обязательные</label>'
+                      '<label><input type="checkbox"> Аналитические</label>'
+                      '<label><input type="checkbox"> Маркетинговые</label>')
+    return (f'<div class="cookie-banner">Мы используем файлы cookie для улучшения работы сайта.'
+            f'{categories}<button>Принять</button></div>')
+
+
+def make_page(kind, rng):
+    """HTML страницы заданного вида"""
+    head = ''.join(f'<script src="{src}"></script>' for src in rng.sample(SCRIPTS, rng.randint(0, 3)))
+    links = ''.join(f'<a href="{href}">{text}</a>' for text, href in rng.sample(LINKS, rng.randint(1, 4)))
+    paragraph_count = 8000 if kind == 'large' else rng.randint(3, 30)
+    body = ''.join(f'<p>{rng.choice(PARAGRAPHS)}</p>' for _ in range(paragraph_count))
+
+    if kind == 'forms':
+        body += ''.join(_form(rng, index) for index in range(rng.randint(5, 40)))
+    elif rng.random() < 0.3:
+        body += _form(rng, 0)
+    if kind == 'cookie':
+        body += _cookie_banner(rng)
+
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{kind}</title>{head}</head>'
+            f'<body><nav>{links}</nav><main>{body}</main></body></html>')
+
+
+def generate_corpus(corpus_dir, count=200, seed=1):
+    """Запись корпуса в каталог; возвращает имена файлов"""
+    rng = random.Random(seed)
+    os.makedirs(corpus_dir, exist_ok=True)
+    total_weight = sum(weight for _, weight in KINDS)
+    names = []
+    for kind, weight in KINDS:
+        for number in range(max(1, round(count * weight / total_weight))):
+            name = f'{kind}_{number:04d}.html'
+            with open(os.path.join(corpus_dir, name), 'w', encoding='utf-8') as f:
+                f.write(make_page(kind, rng))
+            names.append(name)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Генерация синтетического корпуса страниц')
+    parser.add_argument('corpus_dir', help='каталог для страниц')
+    parser.add_argument('--count', type=int, default=200, help='число страниц (по умолчанию 200)')
+    parser.add_argument('--seed', type=int, default=1, help='начальное значение генератора (по умолчанию 1)')
+    args = parser.parse_args()
+
+    names = generate_corpus(args.corpus_dir, args.count, args.seed)
+    print(f"Создано страниц: {len(names)} в {args.corpus_dir}")
+
+
+if __name__ == "__main__":
+    main()
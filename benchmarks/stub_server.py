@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Локальный HTTP-сервер, отдающий корпус сохраненных страниц
+
+Страницы с префиксом slow_ отдаются с задержкой, на страницах с префиксом
+timeout_ сервер не отвечает дольше таймаута чтения проверки. Остальные
+файлы отдаются как есть, несуществующие - с кодом 404.
+
+Использование:
+    python3 benchmarks/stub_server.py <каталог корпуса> [--port N]
+"""
+
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+# Задержки ответа (сек)
+SLOW_DELAY = 0.5
+HANG_DELAY = 30.0
+
+
+class StubServer:
+    """Сервер корпуса в фоновом потоке; используется как контекстный менеджер"""
+
+    def __init__(self, corpus_dir, port=0, slow_delay=SLOW_DELAY, hang_delay=HANG_DELAY):
+        self.corpus_dir = os.path.abspath(corpus_dir)
+        self.slow_delay = slow_delay
+        self.hang_delay = hang_delay
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = os.path.basename(unquote(urlsplit(self.path).path))
+                path = os.path.join(server.corpus_dir, name)
+                if not name or not os.path.isfile(path):
+                    self.send_error(404)
+                    return
+
+                if name.startswith('timeout_'):
+                    time.sleep(server.hang_delay)
+                elif name.startswith('slow_'):
+                    time.sleep(server.slow_delay)
+
+                with open(path, 'rb') as f:
+                    body = f.read()
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Работа сервера в текущем потоке до остановки"""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Локальный сервер корпуса страниц')
+    parser.add_argument('corpus_dir', help='каталог с HTML-страницами')
+    parser.add_argument('--port', type=int, default=8765, help='порт (по умолчанию 8765)')
+    args = parser.parse_args()
+
+    server = StubServer(args.corpus_dir, args.port)
+    print(f"Корпус {args.corpus_dir} доступен по адресу {server.base_url}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
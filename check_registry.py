@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+# Версия логики проверок. Увеличивается при любом изменении правил проверок,
+# чтобы сохраненные результаты предыдущих запусков были пересчитаны
+CHECKS_VERSION = 4
+
+# Описание проверки:
+#   key      - ключ результата в словаре checks
+#   label    - название для отчетов
+#   method   - имя метода SiteChecker, выполняющего проверку
+#   features - признаки страницы, которые нужны проверке (см. page_features.py)
+#   cost     - относительная стоимость; дешевые проверки выполняются первыми
+CheckSpec = namedtuple('CheckSpec', ['key', 'label', 'method', 'features', 'cost'])
+
+# Реестр проверок в порядке вывода в отчетах
+CHECKS = [
+    CheckSpec('privacy_policy', '1. Политика конфиденциальности',
+              'check_privacy_policy', ('links',), 2),
+    CheckSpec('pd_consent_checkboxes', '2. Чекбоксы согласия на обработку ПДн',
+              'check_pd_consent_checkboxes', ('forms',), 3),
+    CheckSpec('checkbox_not_checked', '3. Чекбокс не отмечен по умолчанию',
+              'check_checkbox_not_checked', ('forms',), 1),
+    CheckSpec('consent_logging', '4. Фиксация согласия (логирование)',
+              'check_consent_logging', ('text',), 2),
+    CheckSpec('cookie_popup', '5. Всплывающее окно о cookie',
+              'check_cookie_popup', ('popups',), 3),
+    CheckSpec('cookie_categories', '6. Разделение cookie на категории',
+              'check_cookie_categories', ('text',), 2),
+    CheckSpec('pd_storage_russia', '7. Хранение ПДн на территории РФ',
+              'check_pd_storage_russia', ('text',), 2),
+    CheckSpec('rkn_registration', '8. Регистрация в РКН',
+              'check_rkn_registration', ('text',), 2),
+    CheckSpec('data_subject_email', '9. Email для обращений субъектов данных',
+              'check_data_subject_email', ('text',), 3),
+    CheckSpec('third_party_audit', '10. Аудит сторонних сервисов',
+              'check_third_party_audit', ('scripts', 'text'), 2),
+]
+
+CHECKS_BY_KEY = {spec.key: spec for spec in CHECKS}
+
+
+def check_labels():
+    """Названия проверок по ключам в порядке реестра"""
+    return {spec.key: spec.label for spec in CHECKS}
+
+
+def select_checks(only=None, skip=None):
+    """Выбор проверок для запуска, отсортированных по возрастанию стоимости"""
+    unknown = [key for key in list(only or []) + list(skip or []) if key not in CHECKS_BY_KEY]
+    if unknown:
+        raise ValueError(f"Неизвестные проверки: {', '.join(unknown)}")
+
+    selected = [
+        spec for spec in CHECKS
+        if (not only or spec.key in only) and not (skip and spec.key in skip)
+    ]
+    return sorted(selected, key=lambda spec: spec.cost)
+
+
+def required_features(specs):
+    """Признаки страницы, необходимые выбранным проверкам"""
+    return {feature for spec in specs for feature in spec.features}
@@ -4,8 +4,37 @@
 import requests
 import re
 import json
+import argparse
+import cProfile
+import hashlib
+import multiprocessing
+import os
+import socket
+import threading
+from collections import namedtuple
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError, ReadTimeoutError
+from urllib3.util.retry import Retry
+from check_registry import CHECKS, CHECKS_VERSION, check_labels, required_features, select_checks
+from check_state import CheckStateStore
+from content_sniff import (HTML_TYPES, SNIFF_BYTES, is_binary_type, parse_media_type, sniff_content_type,
+                           sniff_media_type)
+from dns_cache import install_dns_cache
+from history_store import HistoryStore
+from host_probe import probe_hosts
+from host_state import HostStateStore
+from http_cache import CacheMissError, ResponseCache, normalize_cache_url
+from keyword_matcher import KeywordMatcher
+from page_features import PageFeatures
+from result_store import (DEFAULT_RESULTS_FILE, ResultWriter, completed_sites, compliance,
+                          merge_results, read_result_at, read_results, read_results_with_offsets)
+from site_source import iter_sites, parse_shard, shard_of, unique_sites
+from third_party import THIRD_PARTY_INDEX
+from timings import TimedHTTPAdapter, TimingStats, add_phase, phase_time, take_phases
 import time
 from datetime import datetime
 import logging
@@ -14,308 +43,1000 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Ключевые слова проверок по категориям
+KEYWORDS = {
+    'privacy_policy': [
+        'политика конфиденциальности', 'privacy policy', 'privacy',
+        'конфиденциальность', 'обработка персональных данных',
+        'персональные данные', 'политика обработки'
+    ],
+    'privacy_url': ['privacy', 'confidential', 'policy'],
+    'pd_consent': [
+        'согласие', 'согласен', 'соглашаюсь', 'consent', 'agree',
+        'персональные данные', 'personal data', 'обработка', 'processing'
+    ],
+    'consent_logging': [
+        'логирование', 'фиксация', 'запись', 'журнал', 'log', 'logging',
+        'согласие', 'consent', 'timestamp', 'время', 'дата', 'ip'
+    ],
+    'cookie': [
+        'cookie', 'куки', 'файлы cookie', 'cookies', 'куки-файлы'
+    ],
+    'cookie_categories': [
+        'обязательные', 'необходимые', 'required', 'essential',
+        'аналитические', 'analytics', 'маркетинговые', 'marketing',
+        'функциональные', 'functional', 'рекламные', 'advertising'
+    ],
+    'pd_storage_russia': [
+        'россия', 'рф', 'российской федерации', 'территория рф',
+        'russia', 'russian federation', 'российские серверы'
+    ],
+    'rkn_registration': [
+        'ркн', 'роскомнадзор', 'рособрнадзор', 'roskomnadzor',
+        'регистрация', 'registration', 'оператор персональных данных'
+    ],
+    'data_subject': [
+        'субъект данных', 'data subject', 'обращение', 'запрос',
+        'контакт', 'связаться', 'обратная связь'
+    ],
+    'third_party_audit': [
+        'аудит', 'проверка', 'анализ', 'audit', 'review',
+        'сторонние сервисы', 'third party', 'внешние сервисы'
+    ],
+    # Ссылки, по которым выполняется обход страниц сайта
+    'crawl_targets': [
+        'политика конфиденциальности', 'privacy', 'конфиденциальность',
+        'персональные данные', 'персональных данных', 'политика обработки', 'policy',
+        'контакт', 'contact', 'реквизиты', 'о компании', 'about'
+    ],
+}
+
+# Таблица ключевых слов готовится один раз при загрузке модуля
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+
+# Парсеры BeautifulSoup в порядке убывания скорости
+PARSER_PREFERENCE = ['lxml', 'html.parser', 'html5lib']
+
+# Максимальный размер загружаемой страницы (байт); остаток тела не скачивается
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+CHUNK_SIZE = 64 * 1024
+
+# Ограничения обхода страниц одного сайта
+DEFAULT_CRAWL_MAX_PAGES = 5
+DEFAULT_CRAWL_MAX_BYTES = 10 * 1024 * 1024
+
+# Повторные запросы при сбое чтения и ответах ниже; ошибка соединения повторяется не более
+# одного раза, ошибки TLS (сертификат, протокол) не повторяются
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.5
+# Максимальная пауза по заголовку Retry-After, сек (сайт может попросить ждать сутки)
+MAX_RETRY_AFTER = 10.0
+
+# Таймауты соединения и чтения (сек). При известной истории хоста таймауты
+# уменьшаются до TIMEOUT_FACTOR его обычных задержек, но не ниже минимальных
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 10.0
+MIN_CONNECT_TIMEOUT = 1.0
+MIN_READ_TIMEOUT = 3.0
+TIMEOUT_FACTOR = 4
+
+# Предварительная проверка доступности хостов
+DEFAULT_PROBE_TIMEOUT = 3.0
+# Число неудачных проверок подряд, после которого хост откладывается
+DEFAULT_DEAD_AFTER = 3
+
+# Число сайтов, для которых предварительная проверка хостов выполняется вместе
+PLAN_BATCH_SIZE = 1000
+
+# Максимальный размер дискового кэша ответов (байт)
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# Загруженная страница
+Page = namedtuple('Page', ['url', 'status_code', 'headers', 'content', 'truncated', 'cache_status',
+                           'content_type'])
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+def installed_parsers():
+    """Установленные парсеры BeautifulSoup в порядке убывания скорости"""
+    parsers = []
+    for name in PARSER_PREFERENCE:
+        try:
+            BeautifulSoup('', name)
+        except FeatureNotFound:
+            continue
+        parsers.append(name)
+    return parsers
+
+
+def read_body(response, max_bytes, head=b''):
+    """Потоковое чтение тела ответа не более max_bytes байт (head - уже прочитанное начало)"""
+    chunks = [head] if head else []
+    size = len(head)
+    if max_bytes and size > max_bytes:
+        return head[:max_bytes], True
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            # Остаток тела не скачивается: соединение закрывается вместе с ответом
+            return b''.join(chunks)[:max_bytes], True
+    return b''.join(chunks), False
+
+
+def read_page(response, max_bytes):
+    """Потоковое чтение страницы; тело, которое не является HTML, не дочитывается
+    
+    Тип определяется по заголовку Content-Type, а если его недостаточно - по
+    первым SNIFF_BYTES байтам тела. Возвращает прочитанное тело и признак того,
+    что оно прочитано не полностью.
+    """
+    # Страницы ошибок читаются как прежде: их содержимое не анализируется
+    if response.status_code != 200:
+        return read_body(response, max_bytes)
+    header = response.headers.get('Content-Type')
+    if is_binary_type(parse_media_type(header)):
+        return b'', True
+    head = response.raw.read(SNIFF_BYTES, decode_content=True) or b''
+    if sniff_media_type(header, head) not in HTML_TYPES:
+        return head, True
+    return read_body(response, max_bytes, head)
+
+
+class CappedRetry(Retry):
+    """Повторы urllib3 с ограничением паузы, которую задает заголовок Retry-After"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+def timeout_kind(error):
+    """Этап, на котором истек таймаут: 'connect', 'response' или None для других ошибок
+    
+    При повторах urllib3 requests сообщает о таймауте как об ошибке соединения
+    (MaxRetryError с причиной), а при чтении тела напрямую - ReadTimeoutError.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return 'connect'
+    if isinstance(error, requests.exceptions.Timeout):
+        return 'response'
+    reason = error if isinstance(error, ReadTimeoutError) else (error.args[0] if error.args else None)
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    # NewConnectionError (отказ в соединении, ошибка DNS) в urllib3 - подкласс ConnectTimeoutError
+    if isinstance(reason, ConnectTimeoutError) and not isinstance(reason, NewConnectionError):
+        return 'connect'
+    if isinstance(reason, ReadTimeoutError):
+        return 'response'
+    return None
+
+
+def _error_causes(error):
+    """Ошибка и ее причины: вложенные ошибки urllib3 и цепочка __cause__/__context__"""
+    seen = set()
+    stack = [error]
+    while stack:
+        current = stack.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        if isinstance(current, MaxRetryError):
+            stack.append(current.reason)
+        if current.args and isinstance(current.args[0], BaseException):
+            stack.append(current.args[0])
+        stack.append(current.__cause__)
+        stack.append(current.__context__)
+
+
+def https_fallback_allowed(error):
+    """Ошибка HTTPS, после которой есть смысл попробовать HTTP: ошибка TLS или отказ в соединении
+    
+    Таймаут соединения и ошибка разрешения имени повторились бы и по HTTP,
+    поэтому для них вторая попытка не выполняется.
+    """
+    if isinstance(error, requests.exceptions.SSLError):
+        return True
+    if timeout_kind(error):
+        return False
+    causes = list(_error_causes(error))
+    if any(isinstance(cause, socket.gaierror) for cause in causes):
+        return False
+    return any(isinstance(cause, ConnectionRefusedError) for cause in causes)
+
+
+class HostRateLimiter:
+    """Ограничение частоты запросов к одному хосту"""
+
+    def __init__(self, delay=1.0):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        """Ожидание очередного разрешенного слота для хоста из URL"""
+        if self.delay <= 0:
+            return
+        host = urlparse(url).hostname or url
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class SiteChecker:
-    def __init__(self):
+    def __init__(self, max_workers=1, host_delay=1.0, only=None, skip=None,
+                 parser=None, max_bytes=DEFAULT_MAX_BYTES, parser_timings=False,
+                 cache_dir=None, cache_max_bytes=DEFAULT_CACHE_MAX_BYTES, offline=False,
+                 state_db=None, processes=0, crawl_depth=0, crawl_max_pages=DEFAULT_CRAWL_MAX_PAGES,
+                 crawl_max_bytes=DEFAULT_CRAWL_MAX_BYTES, pool_connections=None, pool_maxsize=None,
+                 retries=DEFAULT_RETRIES, retry_backoff=DEFAULT_RETRY_BACKOFF, dns_cache_ttl=0,
+                 host_state=None, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, preflight=False, probe_timeout=DEFAULT_PROBE_TIMEOUT,
+                 dead_after=DEFAULT_DEAD_AFTER, profile_dir=None):
+        self.max_workers = max(1, max_workers)
+        # По умолчанию используется самый быстрый из установленных парсеров
+        self.parser = parser or installed_parsers()[0]
+        self.max_bytes = max_bytes
+        self.parser_timings = parser_timings
+        # Дисковый кэш ответов; в автономном режиме страницы берутся только из него
+        self.cache = ResponseCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.offline = offline
+        # Результаты предыдущих запусков для неизмененных страниц
+        self.state = CheckStateStore(state_db) if state_db else None
+        self.state_version = f"{CHECKS_VERSION}:{self.parser}"
+        # Выбранные проверки и нужные им признаки страницы
+        self.checks = select_checks(only, skip)
+        self.features = required_features(self.checks)
+        # Обход ссылок на политику и контакты: глубина и бюджет страниц и байт на сайт
+        self.crawl_depth = crawl_depth
+        self.crawl_max_pages = crawl_max_pages
+        self.crawl_max_bytes = crawl_max_bytes
+        if crawl_depth:
+            self.features.add('links')
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Пул соединений должен вмещать все одновременные запросы; соединения с хостом
+        # переиспользуются (keep-alive). Недоступный хост не должен занимать поток надолго:
+        # ошибка соединения повторяется не более одного раза, ошибки TLS (other) не повторяются
+        retry = CappedRetry(total=retries, connect=min(retries, 1), read=retries, status=retries,
+                            backoff_factor=retry_backoff, status_forcelist=RETRY_STATUS_CODES,
+                            other=0, allowed_methods=['GET'], raise_on_status=False)
+        adapter = TimedHTTPAdapter(pool_connections=pool_connections or max(10, self.max_workers),
+                              pool_maxsize=pool_maxsize or self.max_workers,
+                              max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if dns_cache_ttl:
+            install_dns_cache(dns_cache_ttl)
+        # Схемы хостов и адреса перенаправлений из предыдущих запусков
+        self.hosts = HostStateStore(host_state) if host_state else None
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # Предварительная проверка хостов и откладывание долго недоступных
+        self.preflight = preflight
+        self.probe_timeout = probe_timeout
+        self.dead_after = dead_after
+        self._skip_reasons = {}
+        # Каталог профилей cProfile отдельных сайтов
+        self.profile_dir = profile_dir
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        self.rate_limiter = HostRateLimiter(host_delay)
+        self.matcher = KEYWORD_MATCHER
+        self.third_party = THIRD_PARTY_INDEX
         self.results = {}
         
+        # Разбор страниц и проверки в отдельных процессах; загрузка остается в потоках.
+        # Между процессами передаются только тело страницы и словари результатов
+        self.process_pool = None
+        if processes:
+            worker_options = {'only': only, 'skip': skip, 'parser': self.parser,
+                              'parser_timings': parser_timings, 'crawl_depth': crawl_depth}
+            self.process_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_analysis_worker,
+                initargs=(worker_options,)
+            )
+        
+        # Потоки загрузки дополнительных страниц при обходе
+        self.crawl_pool = ThreadPoolExecutor(max_workers=self.max_workers) if crawl_depth else None
+    
+    def close(self):
+        """Освобождение ресурсов: пула процессов, сессии и хранилищ"""
+        if self.process_pool:
+            self.process_pool.shutdown()
+            self.process_pool = None
+        if self.crawl_pool:
+            self.crawl_pool.shutdown()
+            self.crawl_pool = None
+        if self.state:
+            self.state.close()
+        if self.hosts:
+            self.hosts.save()
+        self.session.close()
+        
     def normalize_url(self, url):
-        """Нормализация URL"""
+        """Нормализация URL (для адреса без схемы - схема, запомненная для хоста)"""
         if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
+            scheme = 'https'
+            if self.hosts:
+                scheme = self.hosts.scheme(_hostname('//' + url)) or scheme
+            url = f'{scheme}://' + url
         return url.rstrip('/')
     
     def check_site(self, url):
         """Проверка одного сайта по всем критериям"""
         normalized_url = self.normalize_url(url)
+        scheme_given = url.startswith(('http://', 'https://'))
         logger.info(f"Проверяю сайт: {normalized_url}")
         
         result = {
             'url': normalized_url,
             'accessible': False,
             'checks': {},
-            'errors': []
+            'errors': [],
+            'timings': {}
         }
         
+        reached = False
+        site_started = time.perf_counter()
+        # Время сетевых этапов (DNS, соединение, TLS, ожидание, тело) копится в потоке
+        take_phases()
         try:
             # Проверяем доступность сайта
-            response = self.session.get(normalized_url, timeout=10, allow_redirects=True)
-            result['accessible'] = response.status_code == 200
+            started = time.perf_counter()
+            page, normalized_url = self.fetch_site(normalized_url, scheme_given)
+            reached = True
+            result['url'] = normalized_url
+            result['timings']['download'] = time.perf_counter() - started
+            result['bytes'] = len(page.content)
+            if page.cache_status:
+                result['cache'] = page.cache_status
+            result['accessible'] = page.status_code == 200
             
             if not result['accessible']:
-                result['errors'].append(f"Сайт недоступен (код: {response.status_code})")
+                result['errors'].append(f"Сайт недоступен (код: {page.status_code})")
                 return result
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Проверка 1: Политика конфиденциальности
-            result['checks']['privacy_policy'] = self.check_privacy_policy(soup, normalized_url)
-            
-            # Проверка 2: Чекбоксы согласия на обработку ПДн
-            result['checks']['pd_consent_checkboxes'] = self.check_pd_consent_checkboxes(soup)
-            
-            # Проверка 3: Чекбокс не отмечен по умолчанию
-            result['checks']['checkbox_not_checked'] = self.check_checkbox_not_checked(soup)
-            
-            # Проверка 4: Фиксация согласия (логирование)
-            result['checks']['consent_logging'] = self.check_consent_logging(soup)
-            
-            # Проверка 5: Всплывающее окно о cookie
-            result['checks']['cookie_popup'] = self.check_cookie_popup(soup)
-            
-            # Проверка 6: Разделение cookie на обязательные и прочие
-            result['checks']['cookie_categories'] = self.check_cookie_categories(soup)
+            # PDF, изображения и файлы не проверяются: их тело не скачивается целиком.
+            # Сайт при этом доступен, но проверки для него не выполняются
+            if not page.content_type.html:
+                result['not_html'] = True
+                result['content_type'] = page.content_type.media_type
+                result['errors'].append(f"Ответ не является HTML-страницей ({page.content_type.media_type})")
+                return result
             
-            # Проверка 7: Хранение ПДн на территории РФ
-            result['checks']['pd_storage_russia'] = self.check_pd_storage_russia(soup)
+            if page.truncated:
+                logger.warning(f"Страница {normalized_url} обрезана до {self.max_bytes} байт")
+                result['truncated'] = True
             
-            # Проверка 8: Регистрация в РКН
-            result['checks']['rkn_registration'] = self.check_rkn_registration(soup)
+            # Если страница не изменилась с прошлого запуска, результаты берутся из хранилища.
+            # При обходе результаты зависят и от других страниц, поэтому всегда пересчитываются
+            use_state = self.state is not None and not self.crawl_depth
+            content_hash = hashlib.sha256(page.content).hexdigest() if use_state else None
+            if use_state:
+                keys = [spec.key for spec in CHECKS if spec in self.checks]
+                previous = self.state.lookup(normalized_url, content_hash, self.state_version, keys)
+                result['reused'] = previous is not None
+                if previous is not None:
+                    result['checks'], services = previous
+                    if services is not None:
+                        result['services'] = services
+                    return result
             
-            # Проверка 9: Email для обращений субъектов данных
-            result['checks']['data_subject_email'] = self.check_data_subject_email(soup)
+            result['checks'], timings, pages, total_bytes, services = self.analyze_site(page, normalized_url)
+            result['timings'].update(timings)
+            result['parser'] = self.parser
+            if services is not None:
+                result['services'] = services
+            if self.crawl_depth:
+                result['pages'] = pages
+                result['bytes'] = total_bytes
             
-            # Проверка 10: Аудит сторонних сервисов
-            result['checks']['third_party_audit'] = self.check_third_party_audit(soup, response)
+            if use_state:
+                self.state.save(normalized_url, content_hash, self.state_version, result['checks'], services)
             
         except Exception as e:
             result['errors'].append(f"Ошибка при проверке: {str(e)}")
             logger.error(f"Ошибка при проверке {normalized_url}: {str(e)}")
+        finally:
+            # Промах кэша в автономном режиме ничего не говорит о доступности хоста
+            if self.hosts and not self.offline:
+                self.hosts.record_check(_hostname(normalized_url), reached, self.dead_after)
+            result['timings'].update(take_phases())
+            result['timings']['total'] = time.perf_counter() - site_started
         
         return result
     
-    def check_privacy_policy(self, soup, base_url):
-        """Проверка наличия политики конфиденциальности"""
-        # Поиск ссылок на политику конфиденциальности
-        privacy_keywords = [
-            'политика конфиденциальности', 'privacy policy', 'privacy', 
-            'конфиденциальность', 'обработка персональных данных',
-            'персональные данные', 'политика обработки'
-        ]
-        
-        links = soup.find_all('a', href=True)
-        for link in links:
-            link_text = link.get_text().lower()
-            href = link.get('href', '').lower()
-            
-            for keyword in privacy_keywords:
-                if keyword in link_text or keyword in href:
-                    return True
+    def fetch_site(self, url, scheme_given=True):
+        """Загрузка главной страницы с учетом схемы и перенаправлений из прошлых запусков
         
-        # Поиск по URL
-        for keyword in ['privacy', 'confidential', 'policy']:
-            if keyword in base_url.lower():
-                return True
+        Возвращает страницу и адрес сайта (для адреса без схемы при ошибке HTTPS
+        выполняется попытка по HTTP).
+        """
+        # Запомненный конечный адрес позволяет не проходить цепочку перенаправлений;
+        # в автономном режиме страница берется из кэша по запрошенному адресу
+        target = self.hosts.redirect_target(url) if self.hosts and not self.offline else None
+        if target:
+            try:
+                page = self.fetch(target)
+                if page.status_code == 200:
+                    return page, url
+            except requests.RequestException:
+                pass
+            self.hosts.forget_redirect(url)
         
-        return False
+        try:
+            page = self.fetch(url)
+        except CacheMissError:
+            # Сайт без схемы мог быть загружен по HTTP в прошлом запуске
+            if scheme_given or not url.startswith('https://'):
+                raise
+            url = 'http://' + url[len('https://'):]
+            page = self.fetch(url)
+        except (requests.exceptions.SSLError, requests.exceptions.ConnectionError) as e:
+            if scheme_given or not url.startswith('https://') or self.offline or not https_fallback_allowed(e):
+                raise
+            url = 'http://' + url[len('https://'):]
+            logger.info(f"HTTPS недоступен, пробую {url}")
+            page = self.fetch(url)
+        
+        if self.hosts and not self.offline and page.status_code == 200:
+            self.hosts.remember_scheme(url)
+            self.hosts.remember_redirect(url, page.url)
+        return page, url
     
-    def check_pd_consent_checkboxes(self, soup):
-        """Проверка наличия чекбоксов согласия на обработку ПДн"""
-        # Поиск чекбоксов с текстом о согласии
-        consent_keywords = [
-            'согласие', 'согласен', 'соглашаюсь', 'consent', 'agree',
-            'персональные данные', 'personal data', 'обработка', 'processing'
-        ]
+    def fetch(self, url, max_bytes=None):
+        """Загрузка страницы с ограничением размера тела и использованием кэша
         
-        checkboxes = soup.find_all(['input', 'div', 'label'], 
-                                 {'type': 'checkbox'}) + soup.find_all('input')
+        max_bytes - ограничение тела для этого запроса (по умолчанию self.max_bytes).
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        cached = self.cache.get(url) if self.cache else None
         
-        for checkbox in checkboxes:
-            # Проверяем текст рядом с чекбоксом
-            text_content = ''
-            if checkbox.parent:
-                text_content = checkbox.parent.get_text().lower()
-            if checkbox.find_next_sibling():
-                text_content += checkbox.find_next_sibling().get_text().lower()
+        if self.offline:
+            if cached is None:
+                raise CacheMissError("нет сохраненной копии страницы в кэше")
+            return self._cached_page(cached, 'offline')
+        
+        # Условный запрос: при ответе 304 используется сохраненное тело
+        headers = ResponseCache.conditional_headers(cached[0]) if cached else {}
+        
+        timeout = self.timeouts_for(url)
+        full_timeout = (self.connect_timeout, self.read_timeout)
+        try:
+            return self._get(url, timeout, headers, cached, max_bytes)
+        except (requests.exceptions.RequestException, ReadTimeoutError) as e:
+            kind = timeout_kind(e)
+            if kind is None or timeout == full_timeout:
+                raise
+            # Таймаут, сокращенный по истории хоста, мог оказаться мал: оценка задержки
+            # повышается, и запрос повторяется один раз с полными таймаутами
+            self.hosts.record_latency(urlparse(url).hostname or '', kind,
+                                      timeout[0] if kind == 'connect' else timeout[1])
+            logger.info(f"Таймаут {url} при сокращенных таймаутах {timeout}, повтор с полными")
+            return self._get(url, full_timeout, headers, cached, max_bytes)
+    
+    def _get(self, url, timeout, headers, cached, max_bytes):
+        """Один запрос страницы с заданными таймаутами"""
+        self.rate_limiter.wait(url)
+        connection_before = phase_time('dns') + phase_time('connect') + phase_time('tls')
+        started = time.perf_counter()
+        with self.session.get(url, timeout=timeout, allow_redirects=True, stream=True,
+                              headers=headers) as response:
+            # Ожидание ответа без установки соединения
+            connection_time = phase_time('dns') + phase_time('connect') + phase_time('tls') - connection_before
+            add_phase('wait', max(0.0, time.perf_counter() - started - connection_time))
+            if self.hosts:
+                self.hosts.record_latency(urlparse(url).hostname or '', 'response',
+                                          response.elapsed.total_seconds())
+            if response.status_code == 304 and cached:
+                return self._cached_page(cached, 'revalidated')
+            started = time.perf_counter()
+            content, truncated = read_page(response, max_bytes)
+            add_phase('body', time.perf_counter() - started)
+        
+        # Сохраняются и ответы с ошибкой, чтобы автономный режим воспроизводил их статус
+        if self.cache:
+            self.cache.put(url, response.url, response.status_code, response.headers, content, truncated)
+        return Page(response.url, response.status_code, response.headers, content, truncated,
+                    'miss' if self.cache else None,
+                    sniff_content_type(response.headers.get('Content-Type'), content))
+    
+    def timeouts_for(self, url):
+        """Таймауты соединения и чтения; при известной истории - по задержкам хоста"""
+        connect, read = self.connect_timeout, self.read_timeout
+        if self.hosts:
+            host = urlparse(url).hostname or ''
+            connect_latency = self.hosts.latency(host, 'connect')
+            response_latency = self.hosts.latency(host, 'response')
+            if connect_latency is not None:
+                connect = min(connect, max(MIN_CONNECT_TIMEOUT, connect_latency * TIMEOUT_FACTOR))
+            if response_latency is not None:
+                read = min(read, max(MIN_READ_TIMEOUT, response_latency * TIMEOUT_FACTOR))
+        return connect, read
+    
+    def _cached_page(self, cached, cache_status):
+        """Страница из записи кэша"""
+        meta, content = cached
+        headers = CaseInsensitiveDict(meta['headers'])
+        return Page(meta['final_url'], meta['status_code'], headers, content, meta['truncated'],
+                    cache_status, sniff_content_type(headers.get('Content-Type'), content))
+    
+    def analyze_site(self, page, url):
+        """Анализ сайта: главная страница и, при обходе, страницы политики и контактов
+        
+        Возвращает результаты проверок, время этапов, адреса проанализированных
+        страниц, общий объем загруженных данных и сторонние сервисы.
+        """
+        # Ссылки страниц разрешаются относительно конечного адреса (после перенаправлений)
+        pages = [(page.content, page.url, page.content_type.charset)]
+        # Признаки уже разобранных страниц (в пуле процессов страницы разбираются заново)
+        feature_cache = None if self.process_pool else {}
+        checks, timings, links, services = self._analyze(pages, feature_cache)
+        total_bytes = len(page.content)
+        
+        visited = {normalize_cache_url(url), normalize_cache_url(page.url)}
+        for _ in range(self.crawl_depth):
+            # Бюджет байт исчерпан: новые страницы не загружаются
+            remaining = self.crawl_max_bytes - total_bytes
+            if remaining <= 0:
+                break
+            
+            # Ограниченная очередь новых ссылок без повторов
+            frontier = []
+            for link in links:
+                key = normalize_cache_url(link)
+                if key in visited:
+                    continue
+                if len(pages) + len(frontier) >= self.crawl_max_pages:
+                    break
+                visited.add(key)
+                frontier.append(link)
+            if not frontier:
+                break
+            
+            # Оставшийся бюджет делится между страницами, загружаемыми параллельно,
+            # чтобы объем загрузки не превышал его
+            page_limit = max(1, remaining // len(frontier))
+            if self.max_bytes:
+                page_limit = min(self.max_bytes, page_limit)
             
-            for keyword in consent_keywords:
-                if keyword in text_content:
-                    return True
+            started = time.perf_counter()
+            added = False
+            extras = self.crawl_pool.map(self._fetch_extra, frontier, [page_limit] * len(frontier))
+            for link, extra in zip(frontier, extras):
+                if extra is None or extra.status_code != 200 or not extra.content_type.html:
+                    continue
+                # Страница из кэша могла быть сохранена целиком
+                if total_bytes + len(extra.content) > self.crawl_max_bytes:
+                    logger.info(f"Превышен объем загрузки для сайта {url}, страница {link} пропущена")
+                    continue
+                visited.add(normalize_cache_url(extra.url))
+                total_bytes += len(extra.content)
+                pages.append((extra.content, extra.url, extra.content_type.charset))
+                added = True
+            timings['crawl_download'] = timings.get('crawl_download', 0) + time.perf_counter() - started
+            if not added:
+                break
+            
+            checks, extra_timings, links, services = self._analyze(pages, feature_cache)
+            for name, value in extra_timings.items():
+                if isinstance(value, float):
+                    timings[name] = timings.get(name, 0) + value
+                elif isinstance(value, dict):
+                    merged = timings.setdefault(name, {})
+                    for key, seconds in value.items():
+                        merged[key] = merged.get(key, 0) + seconds
         
-        return False
+        return checks, timings, [page_url for _, page_url, _ in pages], total_bytes, services
+    
+    def _analyze(self, pages, feature_cache):
+        """Анализ страниц в текущем процессе или в пуле процессов"""
+        if self.process_pool:
+            return self.process_pool.submit(_analyze_in_worker, pages).result()
+        return self.analyze_pages(pages, feature_cache)
+    
+    def _fetch_extra(self, url, max_bytes):
+        """Загрузка дополнительной страницы сайта; ошибки не прерывают проверку"""
+        try:
+            return self.fetch(url, max_bytes)
+        except Exception as e:
+            logger.info(f"Не удалось загрузить страницу {url}: {str(e)}")
+            return None
+        finally:
+            # Загрузка дополнительных страниц учитывается целиком в crawl_download
+            take_phases()
+    
+    def analyze_page(self, content, url, encoding=None):
+        """Разбор страницы и выполнение проверок; возвращает результаты и время этапов"""
+        checks, timings, _, _ = self.analyze_pages([(content, url, encoding)])
+        return checks, timings
     
-    def check_checkbox_not_checked(self, soup):
+    def analyze_pages(self, pages, feature_cache=None):
+        """Разбор страниц сайта (тело, адрес, кодировка), объединение их признаков и выполнение проверок
+        
+        Возвращает результаты, время этапов, ссылки для дальнейшего обхода и
+        сторонние сервисы (None, если внешние ресурсы страниц не извлекались).
+        """
+        timings = {'parse': 0.0, 'features': 0.0}
+        page_features = []
+        for content, url, encoding in pages:
+            features = feature_cache.get(url) if feature_cache is not None else None
+            if features is None:
+                features = self.extract_features(content, url, timings, encoding)
+                if feature_cache is not None:
+                    feature_cache[url] = features
+            page_features.append(features)
+        
+        features = page_features[0] if len(page_features) == 1 else PageFeatures.merged(page_features)
+        
+        started = time.perf_counter()
+        checks = self.run_checks(features, timings.setdefault('by_check', {}))
+        timings['checks'] = time.perf_counter() - started
+        
+        links = self.crawl_links(page_features) if self.crawl_depth else []
+        services = features.third_party_services(self.third_party) if 'scripts' in self.features else None
+        return checks, timings, links, services
+    
+    def extract_features(self, content, url, timings, encoding=None):
+        """Разбор одной страницы и извлечение признаков; время этапов добавляется в timings
+        
+        Известная кодировка (из заголовка, BOM или <meta>) передается парсеру,
+        чтобы он не определял ее по всему документу.
+        """
+        started = time.perf_counter()
+        soup = BeautifulSoup(content, self.parser, from_encoding=encoding)
+        timings['parse'] += time.perf_counter() - started
+        
+        # Дерево DOM не хранится после извлечения признаков
+        started = time.perf_counter()
+        features = PageFeatures(soup, url, self.features)
+        del soup
+        timings['features'] += time.perf_counter() - started
+        
+        # Для сравнения парсеров страница дополнительно разбирается каждым из них
+        if self.parser_timings:
+            by_parser = timings.setdefault('parse_by_parser', {})
+            for name in installed_parsers():
+                started = time.perf_counter()
+                BeautifulSoup(content, name, from_encoding=encoding)
+                by_parser[name] = by_parser.get(name, 0) + time.perf_counter() - started
+        
+        return features
+    
+    def crawl_links(self, page_features):
+        """Ссылки на политику и контакты того же сайта, найденные на страницах"""
+        links = []
+        for features in page_features:
+            host = _site_host(features.url)
+            for link_text, href, raw_href in features.links:
+                if href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+                    continue
+                if not self.matcher.scan(f"{link_text}\n{href}").any('crawl_targets'):
+                    continue
+                link = urljoin(features.url, raw_href.strip()).split('#')[0]
+                if link.startswith(('http://', 'https://')) and _site_host(link) == host:
+                    links.append(link)
+        return list(dict.fromkeys(links))
+    
+    def run_checks(self, features, timings=None):
+        """Выполнение выбранных проверок: дешевые первыми, результат в порядке реестра
+        
+        Если передан словарь timings, в него записывается время каждой проверки.
+        """
+        computed = {}
+        for spec in self.checks:
+            started = time.perf_counter()
+            computed[spec.key] = getattr(self, spec.method)(features)
+            if timings is not None:
+                timings[spec.key] = time.perf_counter() - started
+        return {spec.key: computed[spec.key] for spec in CHECKS if spec.key in computed}
+    
+    def check_privacy_policy(self, features):
+        """Проверка наличия политики конфиденциальности"""
+        # Поиск ссылок на политику конфиденциальности (текст ссылки и href проверяются вместе)
+        for link_text, href, _ in features.links:
+            if self.matcher.scan(f"{link_text}\n{href}").any('privacy_policy'):
+                return True
+        
+        # Поиск по URL
+        return self.matcher.scan(features.url.lower()).any('privacy_url')
+    
+    def check_pd_consent_checkboxes(self, features):
+        """Проверка наличия чекбоксов согласия на обработку ПДн"""
+        # Проверяем текст рядом с полями; каждый текст проверяется один раз
+        forms = features.forms
+        consent_texts = {
+            index for index, text_content in enumerate(forms.texts)
+            if self.matcher.scan(text_content).any('pd_consent')
+        }
+        return any(consent_texts.intersection(field.contexts) for field in forms.fields)
+    
+    def check_checkbox_not_checked(self, features):
         """Проверка что чекбокс не отмечен по умолчанию"""
         # Это сложно проверить автоматически, но можно искать атрибуты
-        checkboxes = soup.find_all('input', {'type': 'checkbox'})
-        
+        checkboxes = features.forms.checkboxes()
         for checkbox in checkboxes:
             # Если чекбокс не имеет атрибута checked, то он не отмечен по умолчанию
-            if not checkbox.get('checked'):
+            if not checkbox.checked:
                 return True
         
         return len(checkboxes) == 0  # Если чекбоксов нет, считаем что требование выполнено
     
-    def check_consent_logging(self, soup):
+    def check_consent_logging(self, features):
         """Проверка фиксации согласия (логирование)"""
         # Поиск упоминаний о логировании согласий
-        logging_keywords = [
-            'логирование', 'фиксация', 'запись', 'журнал', 'log', 'logging',
-            'согласие', 'consent', 'timestamp', 'время', 'дата', 'ip'
-        ]
-        
-        page_text = soup.get_text().lower()
-        for keyword in logging_keywords:
-            if keyword in page_text:
-                return True
-        
-        return False
+        return features.page_keywords(self.matcher).any('consent_logging')
     
-    def check_cookie_popup(self, soup):
+    def check_cookie_popup(self, features):
         """Проверка всплывающего окна о cookie"""
-        cookie_keywords = [
-            'cookie', 'куки', 'файлы cookie', 'cookies', 'куки-файлы'
-        ]
-        
-        # Поиск элементов, которые могут быть всплывающими окнами
-        popup_selectors = [
-            '.popup', '.modal', '.overlay', '.cookie', '.notification',
-            '[class*="popup"]', '[class*="modal"]', '[class*="cookie"]'
-        ]
-        
-        for selector in popup_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                element_text = element.get_text().lower()
-                for keyword in cookie_keywords:
-                    if keyword in element_text:
-                        return True
+        # Тексты элементов, которые могут быть всплывающими окнами
+        for element_text in features.popup_texts:
+            if self.matcher.scan(element_text).any('cookie'):
+                return True
         
         return False
     
-    def check_cookie_categories(self, soup):
+    def check_cookie_categories(self, features):
         """Проверка разделения cookie на категории"""
-        category_keywords = [
-            'обязательные', 'необходимые', 'required', 'essential',
-            'аналитические', 'analytics', 'маркетинговые', 'marketing',
-            'функциональные', 'functional', 'рекламные', 'advertising'
-        ]
-        
-        page_text = soup.get_text().lower()
-        found_categories = 0
-        
-        for keyword in category_keywords:
-            if keyword in page_text:
-                found_categories += 1
-        
+        found_categories = features.page_keywords(self.matcher).count('cookie_categories', limit=2)
         return found_categories >= 2  # Должно быть минимум 2 категории
     
-    def check_pd_storage_russia(self, soup):
+    def check_pd_storage_russia(self, features):
         """Проверка хранения ПДн на территории РФ"""
-        russia_keywords = [
-            'россия', 'рф', 'российской федерации', 'территория рф',
-            'russia', 'russian federation', 'российские серверы'
-        ]
-        
-        page_text = soup.get_text().lower()
-        for keyword in russia_keywords:
-            if keyword in page_text:
-                return True
-        
-        return False
+        return features.page_keywords(self.matcher).any('pd_storage_russia')
     
-    def check_rkn_registration(self, soup):
+    def check_rkn_registration(self, features):
         """Проверка регистрации в РКН"""
-        rkn_keywords = [
-            'ркн', 'роскомнадзор', 'рособрнадзор', 'roskomnadzor',
-            'регистрация', 'registration', 'оператор персональных данных'
-        ]
-        
-        page_text = soup.get_text().lower()
-        for keyword in rkn_keywords:
-            if keyword in page_text:
-                return True
-        
-        return False
+        return features.page_keywords(self.matcher).any('rkn_registration')
     
-    def check_data_subject_email(self, soup):
+    def check_data_subject_email(self, features):
         """Проверка email для обращений субъектов данных"""
         # Поиск email адресов
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, soup.get_text())
+        has_email = EMAIL_PATTERN.search(features.text) is not None
         
         # Поиск упоминаний о субъектах данных
-        subject_keywords = [
-            'субъект данных', 'data subject', 'обращение', 'запрос',
-            'контакт', 'связаться', 'обратная связь'
-        ]
-        
-        page_text = soup.get_text().lower()
-        has_subject_mention = any(keyword in page_text for keyword in subject_keywords)
+        has_subject_mention = features.page_keywords(self.matcher).any('data_subject')
         
-        return len(emails) > 0 and has_subject_mention
+        return has_email and has_subject_mention
     
-    def check_third_party_audit(self, soup, response):
+    def check_third_party_audit(self, features):
         """Проверка аудита сторонних сервисов"""
-        # Поиск внешних скриптов и сервисов
-        external_scripts = soup.find_all('script', src=True)
-        external_links = soup.find_all('a', href=True)
-        
-        # Известные сторонние сервисы
-        third_party_services = [
-            'google', 'facebook', 'yandex', 'vk', 'twitter', 'instagram',
-            'analytics', 'tracking', 'pixel', 'tag', 'gtag', 'fbq'
-        ]
-        
-        found_services = []
-        for script in external_scripts:
-            src = script.get('src', '').lower()
-            for service in third_party_services:
-                if service in src:
-                    found_services.append(service)
-        
-        # Если найдены сторонние сервисы, проверяем упоминания об их обработке
-        if found_services:
-            audit_keywords = [
-                'аудит', 'проверка', 'анализ', 'audit', 'review',
-                'сторонние сервисы', 'third party', 'внешние сервисы'
-            ]
-            
-            page_text = soup.get_text().lower()
-            return any(keyword in page_text for keyword in audit_keywords)
+        # Если найдены сторонние сервисы (скрипты, встроенные счетчики, фреймы, пиксели),
+        # проверяем упоминания об их обработке
+        if features.third_party_services(self.third_party):
+            return features.page_keywords(self.matcher).any('third_party_audit')
         
         return True  # Если сторонних сервисов нет, считаем что аудит проведен
     
-    def check_all_sites(self, sites_file):
-        """Проверка всех сайтов из файла"""
-        with open(sites_file, 'r', encoding='utf-8') as f:
-            sites = [line.strip() for line in f if line.strip() and not line.startswith('-')]
+    def check_all_sites(self, sites_file, results_file=None, resume=False, shard=None):
+        """Проверка всех сайтов из файла
         
-        logger.info(f"Найдено {len(sites)} сайтов для проверки")
+        Файл (список или выгрузка реестра .json) читается потоково, повторы
+        отбрасываются по нормализованному адресу. shard=(i, N) оставляет только
+        сайты i-й из N частей (по хэшу хоста); номера сайтов остаются общими.
+        Если указан results_file, результат каждого сайта сразу дописывается в файл
+        и не хранится в памяти; с resume=True сайты, уже записанные в файл, пропускаются.
+        Иначе результаты собираются в self.results в порядке входного списка.
+        """
+        if self.hosts:
+            self.hosts.start_run()
+        tasks = enumerate(unique_sites(iter_sites(sites_file)))
+        if shard:
+            shard_index, shard_count = shard
+            logger.info(f"Проверяется часть {shard_index + 1} из {shard_count}")
+            tasks = ((index, site) for index, site in tasks if shard_of(site, shard_count) == shard_index)
+        if results_file and resume:
+            done = completed_sites(results_file)
+            logger.info(f"Продолжение проверки: уже проверено {len(done)}")
+            tasks = ((index, site) for index, site in tasks if site not in done)
         
-        for i, site in enumerate(sites, 1):
-            logger.info(f"Проверяю сайт {i}/{len(sites)}: {site}")
-            result = self.check_site(site)
+        tasks = self._planned(tasks)
+        
+        if results_file:
+            with ResultWriter(results_file, resume=resume) as writer:
+                self._run_tasks(tasks, writer.write)
+            return self.results
+        
+        collected = {}
+        self._run_tasks(tasks, lambda site, index, result: collected.__setitem__(index, (site, result)))
+        # Результаты сохраняются в порядке входного списка
+        for index in sorted(collected):
+            site, result = collected[index]
             self.results[site] = result
+        return self.results
+    
+    def _planned(self, tasks):
+        """Планирование задач частями по мере чтения списка сайтов"""
+        tasks = iter(tasks)
+        while True:
+            batch = list(islice(tasks, PLAN_BATCH_SIZE))
+            if not batch:
+                return
+            yield from self.plan_tasks(batch)
+    
+    def plan_tasks(self, tasks):
+        """Откладывание недоступных хостов и предварительная проверка доступности
+        
+        Сайты отложенных и не прошедших проверку хостов помечаются для пропуска,
+        сайты хостов с недавними неудачами переносятся в конец очереди.
+        """
+        if self.offline or not (self.hosts or self.preflight):
+            return tasks
+        
+        site_hosts = {}
+        # Цель проверки - хост и порты сайта: доступность одного порта не означает доступность другого
+        site_targets = {}
+        for _, site in tasks:
+            # Некорректный адрес не проверяется заранее: ошибка попадет в результат сайта
+            try:
+                parts = urlparse(self.normalize_url(site))
+                host = parts.hostname
+                port = parts.port
+            except ValueError:
+                continue
+            if not host:
+                continue
+            site_hosts[site] = host
+            
+            next_check = self.hosts.next_check(host) if self.hosts else None
+            if next_check:
+                failures = self.hosts.failures(host)
+                self._skip_reasons[site] = (
+                    f"Хост {host} недоступен {failures} проверок подряд, "
+                    f"следующая проверка после {datetime.fromtimestamp(next_check).strftime('%Y-%m-%d %H:%M')}"
+                )
+                continue
             
-            # Небольшая пауза между запросами
-            time.sleep(1)
+            if self.preflight:
+                if port:
+                    ports = (port,)
+                elif site.startswith(('http://', 'https://')):
+                    ports = (443,) if parts.scheme == 'https' else (80,)
+                else:
+                    ports = (443, 80)
+                site_targets[site] = (host, ports)
         
-        return self.results
+        if site_targets:
+            targets = set(site_targets.values())
+            logger.info(f"Предварительная проверка доступности {len(targets)} хостов")
+            probes = probe_hosts(targets, timeout=self.probe_timeout, workers=max(16, self.max_workers * 4))
+            if self.hosts:
+                # Неудачей хоста считается только недоступность всех проверенных портов
+                reachable = {host for (host, _), (ok, _, _) in probes.items() if ok}
+                for (host, _), (ok, connect_time, error) in probes.items():
+                    if ok:
+                        self.hosts.record_latency(host, 'connect', connect_time)
+                    elif host not in reachable:
+                        self.hosts.record_check(host, False, self.dead_after)
+            for site, target in site_targets.items():
+                ok, _, error = probes[target]
+                if not ok:
+                    self._skip_reasons[site] = f"Хост {target[0]} недоступен (предварительная проверка: {error})"
+            dead = sum(1 for ok, _, _ in probes.values() if not ok)
+            logger.info(f"Недоступных хостов: {dead} из {len(probes)}")
+        
+        # Хосты с недавними неудачами проверяются последними
+        if self.hosts:
+            tasks = sorted(tasks, key=lambda task: self.hosts.failures(site_hosts.get(task[1], '')) > 0)
+        return tasks
     
-    def generate_report(self, output_file='result.md'):
-        """Генерация отчета в формате Markdown"""
-        with open(output_file, 'w', encoding='utf-8') as f:
+    def _check_task(self, index, site):
+        reason = self._skip_reasons.pop(site, None)
+        if reason:
+            logger.info(f"Пропускаю сайт {index + 1}: {site} ({reason})")
+            result = {'url': self.normalize_url(site), 'accessible': False, 'checks': {},
+                      'errors': [reason], 'skipped': True}
+            return site, index, result
+        logger.info(f"Проверяю сайт {index + 1}: {site}")
+        if not self.profile_dir:
+            return site, index, self.check_site(site)
+        
+        # Профиль проверки сайта (разбор в пуле процессов в него не попадает)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = self.check_site(site)
+        finally:
+            profiler.disable()
+            name = re.sub(r'[^A-Za-z0-9.-]+', '_', site)[:100]
+            profiler.dump_stats(os.path.join(self.profile_dir, f"{index:06d}_{name}.prof"))
+        return site, index, result
+    
+    def _run_tasks(self, tasks, handle):
+        """Выполнение проверок; handle(site, index, result) вызывается по мере готовности"""
+        # В Python 3.12+ одновременно может работать только один профилировщик,
+        # поэтому при сохранении профилей сайты проверяются последовательно
+        if self.profile_dir and self.max_workers > 1:
+            logger.warning("С --profile-dir сайты проверяются последовательно (в одном потоке)")
+        if self.max_workers == 1 or self.profile_dir:
+            for index, site in tasks:
+                handle(*self._check_task(index, site))
+            return
+        
+        # Параллельная проверка: пауза между запросами соблюдается для каждого хоста отдельно.
+        # Число одновременно запланированных задач ограничено, чтобы не держать в памяти все результаты
+        logger.info(f"Параллельная проверка, потоков: {self.max_workers}")
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for index, site in tasks:
+                if len(in_flight) >= self.max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        handle(*future.result())
+                in_flight.add(executor.submit(self._check_task, index, site))
+            for future in as_completed(in_flight):
+                handle(*future.result())
+    
+    @staticmethod
+    def generate_report(output_file='result.md', results_file=DEFAULT_RESULTS_FILE):
+        """Генерация отчета в формате Markdown по хранилищу результатов
+        
+        Файл результатов читается потоково: первый проход собирает статистику и
+        смещения записей, второй выводит сайты в порядке входного списка.
+        """
+        total_sites = 0
+        accessible_sites = 0
+        reused_sites = 0
+        recomputed_sites = 0
+        skipped_sites = 0
+        not_html_sites = 0
+        offsets = []
+        timing_stats = TimingStats()
+        for offset, record in read_results_with_offsets(results_file):
+            total_sites += 1
+            timing_stats.add(record)
+            accessible_sites += 1 if record['accessible'] else 0
+            reused_sites += 1 if record.get('reused') else 0
+            recomputed_sites += 1 if record.get('reused') is False else 0
+            skipped_sites += 1 if record.get('skipped') else 0
+            not_html_sites += 1 if record.get('not_html') else 0
+            offsets.append((record.get('index', total_sites), offset))
+        offsets.sort()
+        
+        with open(output_file, 'w', encoding='utf-8') as f, open(results_file, 'rb') as source:
             f.write("# Отчет по проверке сайтов на соответствие требованиям к обработке ПДн\n\n")
             f.write(f"Дата проверки: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             
             # Статистика
-            total_sites = len(self.results)
-            accessible_sites = sum(1 for r in self.results.values() if r['accessible'])
-            
             f.write(f"## Статистика\n\n")
             f.write(f"- Всего сайтов: {total_sites}\n")
             f.write(f"- Доступных сайтов: {accessible_sites}\n")
-            f.write(f"- Недоступных сайтов: {total_sites - accessible_sites}\n\n")
+            if not_html_sites:
+                f.write(f"- Из них не HTML-страница (PDF, изображение, файл): {not_html_sites}\n")
+            f.write(f"- Недоступных сайтов: {total_sites - accessible_sites}\n")
+            if skipped_sites:
+                f.write(f"- Пропущено (хост недоступен): {skipped_sites}\n")
+            
+            # Статистика повторного использования результатов (при инкрементальной проверке)
+            if reused_sites or recomputed_sites:
+                f.write(f"- Пересчитано сайтов: {recomputed_sites}\n")
+                f.write(f"- Результаты взяты из предыдущего запуска: {reused_sites}\n")
+            f.write("\n")
             
             # Детальные результаты
             f.write("## Детальные результаты\n\n")
             
-            for site, result in self.results.items():
-                f.write(f"### {site}\n\n")
+            for _, offset in offsets:
+                result = read_result_at(source, offset)
+                f.write(f"### {result['site']}\n\n")
+                
+                if result.get('not_html'):
+                    f.write(f"📄 **Не HTML-страница** ({result['content_type']})\n\n---\n\n")
+                    continue
                 
                 if not result['accessible']:
                     f.write("❌ **Сайт недоступен**\n\n")
@@ -331,32 +1052,22 @@ class SiteChecker:
                 f.write("| Критерий | Статус |\n")
                 f.write("|----------|--------|\n")
                 
-                check_names = {
-                    'privacy_policy': '1. Политика конфиденциальности',
-                    'pd_consent_checkboxes': '2. Чекбоксы согласия на обработку ПДн',
-                    'checkbox_not_checked': '3. Чекбокс не отмечен по умолчанию',
-                    'consent_logging': '4. Фиксация согласия (логирование)',
-                    'cookie_popup': '5. Всплывающее окно о cookie',
-                    'cookie_categories': '6. Разделение cookie на категории',
-                    'pd_storage_russia': '7. Хранение ПДн на территории РФ',
-                    'rkn_registration': '8. Регистрация в РКН',
-                    'data_subject_email': '9. Email для обращений субъектов данных',
-                    'third_party_audit': '10. Аудит сторонних сервисов'
-                }
-                
-                for check_key, check_name in check_names.items():
-                    status = "✅" if checks.get(check_key, False) else "❌"
+                for check_key, check_name in check_labels().items():
+                    if check_key not in checks:
+                        continue
+                    status = "✅" if checks[check_key] else "❌"
                     f.write(f"| {check_name} | {status} |\n")
                 
                 f.write("\n")
                 
                 # Подсчет выполненных требований
-                passed_checks = sum(1 for check in checks.values() if check)
-                total_checks = len(checks)
-                compliance_percentage = (passed_checks / total_checks) * 100
+                passed_checks, total_checks, compliance_percentage = compliance(checks)
                 
                 f.write(f"**Соответствие: {passed_checks}/{total_checks} ({compliance_percentage:.1f}%)**\n\n")
                 
+                if result.get('services'):
+                    f.write(f"**Сторонние сервисы:** {', '.join(result['services'])}\n\n")
+                
                 if result['errors']:
                     f.write("**Ошибки:**\n")
                     for error in result['errors']:
@@ -364,22 +1075,187 @@ class SiteChecker:
                     f.write("\n")
                 
                 f.write("---\n\n")
+            
+            # Время этапов, самые медленные сайты и проверки
+            timing_stats.write_markdown(f, check_labels())
         
         logger.info(f"Отчет сохранен в файл: {output_file}")
 
+# Экземпляр SiteChecker в процессе-обработчике (создается один раз при запуске процесса)
+_worker_checker = None
+
+def _init_analysis_worker(options):
+    global _worker_checker
+    _worker_checker = SiteChecker(host_delay=0, **options)
+
+def _analyze_in_worker(pages):
+    """Разбор страниц сайта и проверки в процессе-обработчике"""
+    return _worker_checker.analyze_pages(pages)
+
+def _hostname(url):
+    """Хост из адреса; для некорректного адреса - пустая строка"""
+    try:
+        return urlparse(url).hostname or ''
+    except ValueError:
+        return ''
+
+def _site_host(url):
+    """Хост сайта без www для сравнения адресов одного сайта"""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def parse_shard_arg(value):
+    """Разбор аргумента --shard"""
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_check_keys(value):
+    """Разбор списка ключей проверок через запятую"""
+    keys = [key.strip() for key in value.split(',') if key.strip()]
+    unknown = [key for key in keys if key not in check_labels()]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"неизвестные проверки: {', '.join(unknown)}")
+    return keys
+
+def add_checker_arguments(parser):
+    """Параметры SiteChecker (общие для пакетной проверки и режима службы)"""
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='число одновременных проверок (по умолчанию 1)')
+    parser.add_argument('-p', '--processes', type=int, nargs='?', const=os.cpu_count(), default=0,
+                        help='разбирать страницы в N процессах (без значения - по числу ядер)')
+    parser.add_argument('--crawl-depth', type=int, default=0,
+                        help='глубина обхода ссылок на политику и контакты (по умолчанию 0 - только главная страница)')
+    parser.add_argument('--crawl-max-pages', type=int, default=DEFAULT_CRAWL_MAX_PAGES,
+                        help=f'максимум страниц на сайт при обходе (по умолчанию {DEFAULT_CRAWL_MAX_PAGES})')
+    parser.add_argument('--crawl-max-bytes', type=int, default=DEFAULT_CRAWL_MAX_BYTES,
+                        help=f'максимум байт на сайт при обходе (по умолчанию {DEFAULT_CRAWL_MAX_BYTES})')
+    parser.add_argument('--pool-connections', type=int, default=None,
+                        help='число хостов, для которых хранятся пулы соединений (по умолчанию max(10, workers))')
+    parser.add_argument('--pool-maxsize', type=int, default=None,
+                        help='максимум соединений с одним хостом (по умолчанию равно workers)')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f'повторы при временных ошибках (по умолчанию {DEFAULT_RETRIES})')
+    parser.add_argument('--retry-backoff', type=float, default=DEFAULT_RETRY_BACKOFF,
+                        help=f'множитель экспоненциальной паузы между повторами, сек (по умолчанию {DEFAULT_RETRY_BACKOFF})')
+    parser.add_argument('--dns-cache-ttl', type=int, default=300,
+                        help='время хранения ответов DNS в кэше процесса, сек (0 - без кэша, по умолчанию 300)')
+    parser.add_argument('--host-state', default=None,
+                        help='файл со схемами хостов и адресами перенаправлений, сохраняемый между запусками')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help=f'таймаут установки соединения, сек (по умолчанию {DEFAULT_CONNECT_TIMEOUT})')
+    parser.add_argument('--read-timeout', type=float, default=DEFAULT_READ_TIMEOUT,
+                        help=f'таймаут чтения ответа, сек (по умолчанию {DEFAULT_READ_TIMEOUT})')
+    parser.add_argument('--preflight', action='store_true',
+                        help='перед загрузкой проверить доступность всех хостов (DNS и TCP) и пропустить недоступные')
+    parser.add_argument('--probe-timeout', type=float, default=DEFAULT_PROBE_TIMEOUT,
+                        help=f'таймаут предварительной проверки, сек (по умолчанию {DEFAULT_PROBE_TIMEOUT})')
+    parser.add_argument('--dead-after', type=int, default=DEFAULT_DEAD_AFTER,
+                        help=f'после скольких неудачных проверок подряд хост откладывается (по умолчанию {DEFAULT_DEAD_AFTER}, нужен --host-state)')
+    parser.add_argument('--host-delay', type=float, default=1.0,
+                        help='минимальная пауза между запросами к одному хосту, сек (по умолчанию 1)')
+    parser.add_argument('--only', type=parse_check_keys, default=None,
+                        help='выполнить только указанные проверки (ключи через запятую)')
+    parser.add_argument('--skip', type=parse_check_keys, default=None,
+                        help='пропустить указанные проверки (ключи через запятую)')
+    parser.add_argument('--parser', choices=PARSER_PREFERENCE, default=None,
+                        help='парсер HTML (по умолчанию самый быстрый из установленных)')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help=f'максимальный размер загружаемой страницы, байт (по умолчанию {DEFAULT_MAX_BYTES})')
+    parser.add_argument('--profile-dir',
+                        help='сохранять профиль cProfile проверки каждого сайта в указанный каталог (сайты проверяются последовательно)')
+    parser.add_argument('--parser-timings', action='store_true',
+                        help='замерить время разбора каждой страницы всеми установленными парсерами')
+    parser.add_argument('--cache-dir', default=None,
+                        help='каталог дискового кэша ответов (по умолчанию кэш отключен)')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+                        help='максимальный размер кэша, МБ (по умолчанию 1024)')
+    parser.add_argument('--offline', action='store_true',
+                        help='проверка только по страницам из кэша, без обращения к сети')
+    parser.add_argument('--state-db', default=None,
+                        help='база результатов предыдущих запусков: неизмененные страницы не проверяются повторно')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Проверка сайтов на соответствие требованиям к обработке ПДн')
+    parser.add_argument('sites_file', nargs='?', default='battle_sites.txt',
+                        help='файл со списком сайтов или выгрузка реестра .json (по умолчанию battle_sites.txt)')
+    parser.add_argument('-o', '--output', default='result.md',
+                        help='файл отчета (по умолчанию result.md)')
+    parser.add_argument('--results', default=DEFAULT_RESULTS_FILE,
+                        help=f'файл результатов в формате JSONL (по умолчанию {DEFAULT_RESULTS_FILE})')
+    parser.add_argument('--resume', action='store_true',
+                        help='продолжить прерванную проверку: сайты, уже записанные в файл результатов, пропускаются')
+    parser.add_argument('--shard', type=parse_shard_arg,
+                        help='проверить только часть i из N (i/N, по хэшу хоста) для распределения между машинами')
+    parser.add_argument('--merge', nargs='+', metavar='RESULTS',
+                        help='объединить файлы результатов частей в --results и построить отчет без проверки')
+    parser.add_argument('--history',
+                        help='добавить результаты запуска в файл истории (SQLite) для сравнения запусков')
+    add_checker_arguments(parser)
+    parser.add_argument('--list-checks', action='store_true',
+                        help='вывести список проверок и выйти')
+    args = parser.parse_args()
+    if args.offline and not args.cache_dir:
+        parser.error('для --offline нужно указать --cache-dir')
+    return args
+
+def create_checker(args):
+    """SiteChecker с параметрами командной строки"""
+    return SiteChecker(max_workers=args.workers, host_delay=args.host_delay,
+                       only=args.only, skip=args.skip, parser=args.parser,
+                       max_bytes=args.max_bytes, parser_timings=args.parser_timings,
+                       cache_dir=args.cache_dir, cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+                       offline=args.offline, state_db=args.state_db, processes=args.processes,
+                       crawl_depth=args.crawl_depth, crawl_max_pages=args.crawl_max_pages,
+                       crawl_max_bytes=args.crawl_max_bytes, pool_connections=args.pool_connections,
+                       pool_maxsize=args.pool_maxsize, retries=args.retries,
+                       retry_backoff=args.retry_backoff, dns_cache_ttl=args.dns_cache_ttl,
+                       host_state=args.host_state, connect_timeout=args.connect_timeout,
+                       read_timeout=args.read_timeout, preflight=args.preflight,
+                       probe_timeout=args.probe_timeout, dead_after=args.dead_after,
+                       profile_dir=args.profile_dir)
+
 def main():
-    checker = SiteChecker()
-    results = checker.check_all_sites('battle_sites.txt')
-    checker.generate_report('result.md')
+    args = parse_args()
+    if args.list_checks:
+        for spec in CHECKS:
+            print(f"{spec.key:<24} {spec.label}")
+        return
+    
+    # Объединение результатов частей, проверенных отдельно
+    if args.merge:
+        count = merge_results(args.merge, args.results)
+        logger.info(f"Объединено результатов: {count} из {len(args.merge)} файлов в {args.results}")
+    else:
+        checker = create_checker(args)
+        try:
+            checker.check_all_sites(args.sites_file, args.results, resume=args.resume, shard=args.shard)
+        finally:
+            checker.close()
+    SiteChecker.generate_report(args.output, args.results)
+    
+    # Запуск добавляется в историю для сравнения с предыдущими
+    if args.history:
+        history = HistoryStore(args.history)
+        try:
+            run_id = history.add_run(read_results(args.results))
+        finally:
+            history.close()
+        logger.info(f"Запуск #{run_id} добавлен в историю {args.history}")
     
     # Вывод краткой статистики
-    total = len(results)
-    accessible = sum(1 for r in results.values() if r['accessible'])
+    total = 0
+    accessible = 0
+    for record in read_results(args.results):
+        total += 1
+        accessible += 1 if record['accessible'] else 0
     print(f"\nПроверка завершена!")
     print(f"Всего сайтов: {total}")
     print(f"Доступных: {accessible}")
     print(f"Недоступных: {total - accessible}")
-    print(f"Отчет сохранен в result.md")
+    print(f"Результаты сохранены в {args.results}")
+    print(f"Отчет сохранен в {args.output}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class CheckStateStore:
+    """Результаты проверок предыдущих запусков по URL
+
+    Для каждого URL хранится хэш содержимого страницы, версия проверок,
+    словарь checks и найденные сторонние сервисы. Если страница не изменилась
+    и версия совпадает, проверки можно не выполнять повторно.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS check_state (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                checks TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # Сторонние сервисы (столбец добавлен позже; в старых файлах его нет)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(check_state)")}
+        if 'services' not in columns:
+            self._conn.execute("ALTER TABLE check_state ADD COLUMN services TEXT")
+        self._conn.commit()
+
+    def lookup(self, url, content_hash, version, keys):
+        """Сохраненные результаты проверок keys и сторонние сервисы (или None для
+        сервисов, если они не сохранялись); None, если результаты нужно пересчитать
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, version, checks, services FROM check_state WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or row[0] != content_hash or row[1] != version:
+            return None
+
+        checks = json.loads(row[2])
+        if any(key not in checks for key in keys):
+            return None
+        services = json.loads(row[3]) if row[3] is not None else None
+        return {key: checks[key] for key in keys}, services
+
+    def save(self, url, content_hash, version, checks, services=None):
+        """Сохранение результатов; результаты других проверок для той же страницы сохраняются"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, version, checks, services FROM check_state WHERE url = ?", (url,)
+            ).fetchone()
+            merged = {}
+            if row is not None and row[0] == content_hash and row[1] == version:
+                merged = json.loads(row[2])
+                if services is None and row[3] is not None:
+                    services = json.loads(row[3])
+            merged.update(checks)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO check_state (url, content_hash, version, checks, services, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, content_hash, version, json.dumps(merged),
+                 json.dumps(services, ensure_ascii=False) if services is not None else None, time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import codecs
+import re
+from collections import namedtuple
+
+# Тип содержимого ответа: MIME-тип, признак HTML-страницы и кодировка (или None)
+ContentType = namedtuple('ContentType', ['media_type', 'html', 'charset'])
+
+# Сколько первых байт тела читается для определения типа содержимого
+SNIFF_BYTES = 1024
+
+# Сколько первых байт просматривается в поисках <meta charset>
+META_SCAN_BYTES = 4096
+
+HTML_TYPES = {'text/html', 'application/xhtml+xml'}
+
+# Типы, которые по заголовку заведомо не являются страницей: тело не читается совсем
+BINARY_TYPE_PREFIXES = ('image/', 'audio/', 'video/', 'font/', 'model/')
+BINARY_TYPES = {
+    'application/pdf', 'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/x-rar-compressed', 'application/vnd.rar', 'application/x-7z-compressed',
+    'application/msword', 'application/vnd.ms-excel', 'application/vnd.ms-powerpoint',
+    'application/rtf', 'application/x-msdownload', 'application/java-archive',
+}
+BINARY_TYPE_PREFIXES_VND = ('application/vnd.openxmlformats-', 'application/vnd.oasis.opendocument.')
+
+# Сигнатуры файлов в начале тела: (смещение, байты, тип)
+MAGIC_NUMBERS = [
+    (0, b'%PDF-', 'application/pdf'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (8, b'WEBP', 'image/webp'),
+    (0, b'\x00\x00\x01\x00', 'image/x-icon'),
+    (0, b'PK\x03\x04', 'application/zip'),
+    (0, b'\x1f\x8b', 'application/gzip'),
+    (0, b'Rar!\x1a\x07', 'application/vnd.rar'),
+    (0, b"7z\xbc\xaf'\x1c", 'application/x-7z-compressed'),
+    (0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/msword'),
+    (0, b'{\\rtf', 'application/rtf'),
+    (0, b'MZ', 'application/x-msdownload'),
+    (4, b'ftyp', 'video/mp4'),
+    (0, b'ID3', 'audio/mpeg'),
+    (0, b'OggS', 'application/ogg'),
+]
+
+# Начало HTML-документа (после BOM и пробелов)
+HTML_START_PATTERN = re.compile(
+    rb'<(?:!doctype\s+html|html|head|body|title|meta|script|style|link|div|p|table|iframe|a\s|br|h1|!--)',
+    re.IGNORECASE
+)
+HTML_TAG_PATTERN = re.compile(rb'<(?:html|head|body)[\s>]', re.IGNORECASE)
+
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
+
+CHARSET_PARAM_PATTERN = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+META_CHARSET_PATTERN = re.compile(
+    rb'<meta[^>]+?charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE
+)
+
+
+def parse_media_type(header):
+    """MIME-тип из заголовка Content-Type в нижнем регистре (без параметров)"""
+    return (header or '').split(';', 1)[0].strip().lower()
+
+
+def is_binary_type(media_type):
+    """Тип из заголовка заведомо не является HTML-страницей"""
+    return (media_type in BINARY_TYPES or media_type.startswith(BINARY_TYPE_PREFIXES)
+            or media_type.startswith(BINARY_TYPE_PREFIXES_VND))
+
+
+def sniff_media_type(header, head):
+    """Тип содержимого по заголовку Content-Type и первым байтам тела
+
+    Сигнатура двоичного файла важнее заголовка (файл, отданный как text/html),
+    а начало HTML-документа - важнее заголовка вида application/octet-stream.
+    """
+    for offset, magic, media_type in MAGIC_NUMBERS:
+        if head.startswith(magic, offset):
+            return media_type
+
+    declared = parse_media_type(header)
+    text = head
+    for bom, _ in BOMS:
+        if text.startswith(bom):
+            text = text[len(bom):]
+            break
+    if HTML_START_PATTERN.match(text.lstrip()):
+        return 'text/html'
+    if declared in HTML_TYPES:
+        return declared
+    # Без заголовка или с общим типом страница определяется по тегам в начале тела
+    if declared in ('', 'text/plain', 'application/octet-stream') and HTML_TAG_PATTERN.search(head):
+        return 'text/html'
+    return declared or 'application/octet-stream'
+
+
+def _codec_name(name):
+    """Каноническое имя кодировки или None для неизвестной"""
+    try:
+        return codecs.lookup(name.decode('ascii') if isinstance(name, bytes) else name).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+
+def detect_charset(header, content):
+    """Кодировка HTML-страницы без разбора всего документа
+
+    Порядок: BOM, параметр charset заголовка Content-Type, <meta charset> в
+    начале страницы. Если кодировка не объявлена, а тело корректно в UTF-8,
+    возвращается utf-8; иначе None (кодировку определяет парсер).
+    """
+    for bom, name in BOMS:
+        if content.startswith(bom):
+            return name
+
+    match = CHARSET_PARAM_PATTERN.search(header or '')
+    if match:
+        charset = _codec_name(match.group(1))
+        if charset:
+            return charset
+
+    match = META_CHARSET_PATTERN.search(content, 0, META_SCAN_BYTES)
+    if match:
+        charset = _codec_name(match.group(1))
+        if charset:
+            # Объявленная в документе UTF-16 при чтении байтов как ASCII невозможна
+            return 'utf-8' if charset.startswith('utf-16') else charset
+
+    # Незавершенный символ в конце обрезанной страницы ошибкой не считается
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(content)
+    except UnicodeDecodeError:
+        return None
+    return 'utf-8'
+
+
+def sniff_content_type(header, content):
+    """Тип содержимого по заголовку и началу тела; кодировка - только для HTML"""
+    media_type = sniff_media_type(header, content[:SNIFF_BYTES])
+    if media_type not in HTML_TYPES:
+        return ContentType(media_type, False, None)
+    return ContentType(media_type, True, detect_charset(header, content))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import socket
+import threading
+import time
+
+from timings import add_phase
+
+# Исходная функция разрешения имен
+_original_getaddrinfo = socket.getaddrinfo
+
+# Время хранения неудачных ответов (сек): недоступные хосты не разрешаются
+# заново при каждой повторной попытке
+NEGATIVE_TTL = 30
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def install_dns_cache(ttl=300):
+    """Кэширование результатов socket.getaddrinfo внутри процесса"""
+
+    def cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with _lock:
+            entry = _cache.get(key)
+        if entry is not None and entry[0] > now:
+            if isinstance(entry[1], Exception):
+                raise entry[1]
+            return entry[1]
+
+        try:
+            result = _original_getaddrinfo(host, port, family, type, proto, flags)
+        except socket.gaierror as e:
+            with _lock:
+                _cache[key] = (now + NEGATIVE_TTL, e)
+            raise
+        finally:
+            add_phase('dns', time.monotonic() - now)
+
+        with _lock:
+            _cache[key] = (now + ttl, result)
+        return result
+
+    socket.getaddrinfo = cached_getaddrinfo
+
+
+def uninstall_dns_cache():
+    """Восстановление исходного разрешения имен и очистка кэша"""
+    socket.getaddrinfo = _original_getaddrinfo
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""История запусков проверки: хранилище и сравнение запусков
+
+Использование:
+    python3 history_store.py add results.jsonl [--db history.db] [--label метка]
+    python3 history_store.py runs
+    python3 history_store.py diff [--base ЗАПУСК] [--run ЗАПУСК] [--check ключ] [--regressions]
+    python3 history_store.py trend [--check ключ] [--last N]
+    python3 history_store.py site example.ru
+"""
+
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from check_registry import check_labels
+from result_store import read_results
+
+DEFAULT_HISTORY_DB = 'history.db'
+
+
+class HistoryStore:
+    """Результаты всех запусков в SQLite
+
+    Для каждой пары (сайт, запуск) хранится одна строка: доступность и две
+    битовые маски - проверки, которые выполнялись, и проверки, которые пройдены.
+    Номер бита проверки закрепляется при первом появлении ключа. Сводка по
+    критериям каждого запуска сохраняется при добавлении запуска, поэтому
+    динамика не требует просмотра всех строк.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY,
+                started_at REAL NOT NULL,
+                label TEXT,
+                total_sites INTEGER NOT NULL,
+                accessible_sites INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sites (
+                site_id INTEGER PRIMARY KEY,
+                site TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS check_bits (
+                check_key TEXT PRIMARY KEY,
+                bit INTEGER NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS site_results (
+                run_id INTEGER NOT NULL,
+                site_id INTEGER NOT NULL,
+                accessible INTEGER NOT NULL,
+                present_mask INTEGER NOT NULL,
+                passed_mask INTEGER NOT NULL,
+                PRIMARY KEY (run_id, site_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS site_results_by_site ON site_results (site_id, run_id);
+            CREATE TABLE IF NOT EXISTS run_criteria (
+                run_id INTEGER NOT NULL,
+                check_key TEXT NOT NULL,
+                passed INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                PRIMARY KEY (run_id, check_key)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+        self._bits = dict(self._conn.execute("SELECT check_key, bit FROM check_bits"))
+
+    def _bit(self, key):
+        """Номер бита проверки; новый ключ получает следующий свободный бит"""
+        bit = self._bits.get(key)
+        if bit is None:
+            bit = len(self._bits)
+            self._conn.execute("INSERT INTO check_bits (check_key, bit) VALUES (?, ?)", (key, bit))
+            self._bits[key] = bit
+        return bit
+
+    def add_run(self, records, started_at=None, label=None):
+        """Добавление запуска из последовательности записей результатов; возвращает номер запуска"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, label, total_sites, accessible_sites) VALUES (?, ?, 0, 0)",
+                (started_at or time.time(), label)
+            )
+            run_id = cursor.lastrowid
+            total_sites = 0
+            accessible_sites = 0
+            criteria = {}
+            rows = []
+            for record in records:
+                total_sites += 1
+                present_mask = 0
+                passed_mask = 0
+                if record['accessible']:
+                    accessible_sites += 1
+                    for key, passed in record['checks'].items():
+                        bit = 1 << self._bit(key)
+                        present_mask |= bit
+                        stats = criteria.setdefault(key, [0, 0])
+                        stats[1] += 1
+                        if passed:
+                            passed_mask |= bit
+                            stats[0] += 1
+                rows.append((record['site'], record['accessible'], present_mask, passed_mask))
+                if len(rows) >= 1000:
+                    self._insert_rows(run_id, rows)
+                    rows = []
+            self._insert_rows(run_id, rows)
+
+            self._conn.executemany(
+                "INSERT INTO run_criteria (run_id, check_key, passed, total) VALUES (?, ?, ?, ?)",
+                [(run_id, key, passed, total) for key, (passed, total) in criteria.items()]
+            )
+            self._conn.execute("UPDATE runs SET total_sites = ?, accessible_sites = ? WHERE run_id = ?",
+                               (total_sites, accessible_sites, run_id))
+            self._conn.commit()
+        return run_id
+
+    def _insert_rows(self, run_id, rows):
+        self._conn.executemany("INSERT OR IGNORE INTO sites (site) VALUES (?)", [(row[0],) for row in rows])
+        # Повторная запись сайта в одном запуске заменяет предыдущую (например, после --resume)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO site_results (run_id, site_id, accessible, present_mask, passed_mask) "
+            "SELECT ?, site_id, ?, ?, ? FROM sites WHERE site = ?",
+            [(run_id, int(accessible), present, passed, site) for site, accessible, present, passed in rows]
+        )
+
+    def runs(self):
+        """Запуски: (номер, время, метка, всего сайтов, доступных)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT run_id, started_at, label, total_sites, accessible_sites FROM runs ORDER BY run_id"
+            ).fetchall()
+
+    def last_runs(self, count=2):
+        """Номера последних запусков в хронологическом порядке"""
+        with self._lock:
+            rows = self._conn.execute("SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?", (count,)).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def diff(self, base_run, run, check_key=None):
+        """Изменения результатов сайтов между двумя запусками
+
+        Возвращает список (сайт, изменения), где изменения - словарь
+        {ключ проверки: (было, стало)}; для доступности используется ключ
+        'accessible'. Сайты, которых нет в одном из запусков, не выводятся.
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT s.site, a.accessible, a.present_mask, a.passed_mask,
+                       b.accessible, b.present_mask, b.passed_mask
+                FROM site_results a
+                JOIN site_results b ON b.run_id = ? AND b.site_id = a.site_id
+                JOIN sites s ON s.site_id = a.site_id
+                WHERE a.run_id = ?
+                  AND (a.accessible != b.accessible OR a.passed_mask != b.passed_mask
+                       OR a.present_mask != b.present_mask)
+                ORDER BY s.site
+            """, (run, base_run)).fetchall()
+
+        if check_key and check_key not in self._bits:
+            return []
+        keys = [check_key] if check_key else list(self._bits)
+        changes = []
+        for site, was_accessible, was_present, was_passed, is_accessible, is_present, is_passed in rows:
+            site_changes = {}
+            if was_accessible != is_accessible and not check_key:
+                site_changes['accessible'] = (bool(was_accessible), bool(is_accessible))
+            for key in keys:
+                bit = 1 << self._bits[key]
+                # Сравниваются только проверки, выполненные в обоих запусках
+                if was_present & is_present & bit and (was_passed ^ is_passed) & bit:
+                    site_changes[key] = (bool(was_passed & bit), bool(is_passed & bit))
+            if site_changes:
+                changes.append((site, site_changes))
+        return changes
+
+    def trend(self, check_key=None, last=None):
+        """Процент выполнения критериев по запускам: {ключ: [(номер запуска, выполнено, всего)]}"""
+        query = "SELECT run_id, check_key, passed, total FROM run_criteria"
+        params = []
+        conditions = []
+        if check_key:
+            conditions.append("check_key = ?")
+            params.append(check_key)
+        if last:
+            conditions.append("run_id IN (SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?)")
+            params.append(last)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY run_id"
+
+        trend = {}
+        with self._lock:
+            for run_id, key, passed, total in self._conn.execute(query, params):
+                trend.setdefault(key, []).append((run_id, passed, total))
+        return trend
+
+    def site_history(self, site):
+        """Результаты сайта по запускам: [(номер запуска, доступен, {ключ: пройдена})]"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT r.run_id, r.accessible, r.present_mask, r.passed_mask
+                FROM site_results r JOIN sites s ON s.site_id = r.site_id
+                WHERE s.site = ?
+                ORDER BY r.run_id
+            """, (site,)).fetchall()
+        return [
+            (run_id, bool(accessible),
+             {key: bool(passed & (1 << bit)) for key, bit in self._bits.items() if present & (1 << bit)})
+            for run_id, accessible, present, passed in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _status(value):
+    return "✅" if value else "❌"
+
+
+def _run_title(run):
+    run_id, started_at, label = run[:3]
+    title = f"#{run_id} {datetime.fromtimestamp(started_at).strftime('%Y-%m-%d %H:%M')}"
+    return f"{title} ({label})" if label else title
+
+
+def print_diff(store, base_run, run, check_key=None, regressions=False):
+    labels = check_labels()
+    runs = {row[0]: row for row in store.runs()}
+    changes = store.diff(base_run, run, check_key)
+    if regressions:
+        changes = [
+            (site, {key: change for key, change in site_changes.items() if change[0] and not change[1]})
+            for site, site_changes in changes
+        ]
+        changes = [(site, site_changes) for site, site_changes in changes if site_changes]
+
+    print(f"# Изменения: {_run_title(runs[base_run])} → {_run_title(runs[run])}\n")
+    if not changes:
+        print("Изменений нет")
+        return
+    for site, site_changes in changes:
+        print(f"## {site}\n")
+        for key, (before, after) in site_changes.items():
+            name = 'Доступность' if key == 'accessible' else labels.get(key, key)
+            print(f"- {name}: {_status(before)} → {_status(after)}")
+        print()
+    print(f"Изменилось сайтов: {len(changes)}")
+
+
+def print_trend(store, check_key=None, last=None):
+    labels = check_labels()
+    runs = {row[0]: row for row in store.runs()}
+    trend = store.trend(check_key, last)
+    # Критерии в порядке реестра, затем неизвестные реестру ключи
+    keys = [key for key in labels if key in trend] + sorted(key for key in trend if key not in labels)
+    for key in keys:
+        print(f"## {labels.get(key, key)}\n")
+        for run_id, passed, total in trend[key]:
+            percentage = passed / total * 100 if total else 0.0
+            bar = '█' * round(percentage / 5)
+            print(f"{_run_title(runs[run_id]):<32} {percentage:5.1f}% {bar}")
+        print()
+
+
+def print_site(store, site):
+    labels = check_labels()
+    runs = {row[0]: row for row in store.runs()}
+    history = store.site_history(site)
+    if not history:
+        print(f"Сайта {site} нет в истории")
+        return
+    print(f"# {site}\n")
+    for run_id, accessible, checks in history:
+        if not accessible:
+            print(f"- {_run_title(runs[run_id])}: недоступен")
+            continue
+        failed = [labels.get(key, key) for key, passed in checks.items() if not passed]
+        passed = len(checks) - len(failed)
+        detail = f"; не выполнено: {', '.join(failed)}" if failed else ""
+        print(f"- {_run_title(runs[run_id])}: {passed}/{len(checks)}{detail}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='История запусков проверки сайтов')
+    parser.add_argument('--db', default=DEFAULT_HISTORY_DB,
+                        help=f'файл истории (по умолчанию {DEFAULT_HISTORY_DB})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help='добавить запуск из файла результатов')
+    add.add_argument('results_file', help='файл результатов в формате JSONL')
+    add.add_argument('--label', help='метка запуска')
+
+    commands.add_parser('runs', help='список запусков')
+
+    diff = commands.add_parser('diff', help='изменения результатов сайтов между запусками')
+    diff.add_argument('--base', type=int, help='номер исходного запуска (по умолчанию предпоследний)')
+    diff.add_argument('--run', type=int, help='номер сравниваемого запуска (по умолчанию последний)')
+    diff.add_argument('--check', help='только указанная проверка')
+    diff.add_argument('--regressions', action='store_true', help='только проверки, которые перестали выполняться')
+
+    trend = commands.add_parser('trend', help='процент выполнения критериев по запускам')
+    trend.add_argument('--check', help='только указанная проверка')
+    trend.add_argument('--last', type=int, help='только последние N запусков')
+
+    site = commands.add_parser('site', help='результаты сайта по запускам')
+    site.add_argument('site', help='сайт в том виде, в каком он указан в списке')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = HistoryStore(args.db)
+    try:
+        if args.command == 'add':
+            run_id = store.add_run(read_results(args.results_file), label=args.label)
+            print(f"Запуск #{run_id} добавлен в {args.db}")
+        elif args.command == 'runs':
+            for run in store.runs():
+                print(f"{_run_title(run)}: сайтов {run[3]}, доступных {run[4]}")
+        elif args.command == 'diff':
+            last = store.last_runs(2)
+            base_run = args.base if args.base is not None else (last[0] if len(last) == 2 else None)
+            run = args.run if args.run is not None else (last[-1] if last else None)
+            if base_run is None or run is None:
+                sys.exit("Для сравнения нужны как минимум два запуска")
+            known = {row[0] for row in store.runs()}
+            unknown = [str(run_id) for run_id in (base_run, run) if run_id not in known]
+            if unknown:
+                sys.exit(f"Нет запусков: {', '.join(unknown)}")
+            print_diff(store, base_run, run, args.check, args.regressions)
+        elif args.command == 'trend':
+            print_trend(store, args.check, args.last)
+        elif args.command == 'site':
+            print_site(store, args.site)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def probe_host(host, ports, timeout):
+    """Проверка доступности хоста: разрешение имени и TCP-соединение
+
+    Возвращает (доступен, время соединения в секундах, текст ошибки).
+    """
+    error = None
+    for port in ports:
+        started = time.monotonic()
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True, time.monotonic() - started, None
+        except socket.gaierror as e:
+            # Имя не разрешается - другие порты проверять бессмысленно
+            return False, None, f"DNS: {e}"
+        except OSError as e:
+            error = f"порт {port}: {e}"
+    return False, None, error
+
+
+def probe_hosts(targets, timeout=3.0, workers=64):
+    """Параллельная проверка доступности хостов
+
+    targets - набор пар (хост, кортеж портов); результат - {(хост, порты): (доступен, время, ошибка)}.
+    Один хост с разными портами проверяется отдельно для каждого набора портов.
+    """
+    if not targets:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(targets))) as executor:
+        futures = {
+            target: executor.submit(probe_host, target[0], target[1], timeout)
+            for target in targets
+        }
+        return {target: future.result() for target, future in futures.items()}
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+# Коэффициент сглаживания истории задержек
+LATENCY_SMOOTHING = 0.3
+
+# Максимальная пауза перед повторной проверкой недоступного хоста (сек)
+MAX_BACKOFF = 30 * 24 * 3600
+BACKOFF_BASE = 24 * 3600
+
+
+class HostStateStore:
+    """Сведения о хостах, сохраняемые между запусками
+
+    Для каждого хоста запоминается схема, по которой сайт открылся, а для
+    каждого адреса - конечный адрес после перенаправлений, чтобы при следующем
+    запуске не повторять неудачное соединение и цепочку перенаправлений.
+    Кроме того, хранятся сглаженные задержки хоста и число неудачных проверок
+    подряд: хосты, недоступные несколько запусков подряд, откладываются.
+    Неудача учитывается не чаще одного раза за запуск (start_run), даже если
+    в списке несколько адресов хоста.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._redirects = {}
+        # Хосты, неудача которых уже учтена в текущем запуске
+        self._failed_in_run = set()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._hosts = data.get('hosts', {})
+            self._redirects = data.get('redirects', {})
+
+    def scheme(self, host):
+        """Схема, по которой хост открылся в прошлый раз, или None"""
+        with self._lock:
+            return self._hosts.get(host.lower(), {}).get('scheme')
+
+    def remember_scheme(self, url):
+        parts = urlparse(url)
+        if parts.hostname:
+            with self._lock:
+                self._hosts.setdefault(parts.hostname, {})['scheme'] = parts.scheme
+
+    def redirect_target(self, url):
+        """Конечный адрес перенаправлений для url или None"""
+        with self._lock:
+            return self._redirects.get(url)
+
+    def remember_redirect(self, url, final_url):
+        with self._lock:
+            if final_url.rstrip('/') == url.rstrip('/'):
+                self._redirects.pop(url, None)
+            else:
+                self._redirects[url] = final_url
+
+    def forget_redirect(self, url):
+        with self._lock:
+            self._redirects.pop(url, None)
+
+    def record_latency(self, host, kind, seconds):
+        """Обновление сглаженной задержки хоста (kind: connect или response)"""
+        with self._lock:
+            entry = self._hosts.setdefault(host.lower(), {})
+            previous = entry.get(kind)
+            if previous is None:
+                entry[kind] = seconds
+            else:
+                entry[kind] = previous + LATENCY_SMOOTHING * (seconds - previous)
+
+    def latency(self, host, kind):
+        """Сглаженная задержка хоста или None"""
+        with self._lock:
+            return self._hosts.get(host.lower(), {}).get(kind)
+
+    def failures(self, host):
+        """Число неудачных проверок хоста подряд"""
+        with self._lock:
+            return self._hosts.get(host.lower(), {}).get('failures', 0)
+
+    def start_run(self):
+        """Начало нового запуска: неудачи хостов снова учитываются"""
+        with self._lock:
+            self._failed_in_run.clear()
+
+    def record_check(self, host, ok, dead_after):
+        """Учет результата проверки; после dead_after неудачных запусков подряд хост откладывается"""
+        host = host.lower()
+        with self._lock:
+            entry = self._hosts.setdefault(host, {})
+            if ok:
+                entry.pop('failures', None)
+                entry.pop('next_check', None)
+                self._failed_in_run.discard(host)
+                return
+            if host in self._failed_in_run:
+                return
+            self._failed_in_run.add(host)
+            failures = entry.get('failures', 0) + 1
+            entry['failures'] = failures
+            if failures >= dead_after:
+                backoff = min(BACKOFF_BASE * 2 ** (failures - dead_after), MAX_BACKOFF)
+                entry['next_check'] = time.time() + backoff
+
+    def next_check(self, host):
+        """Время, до которого хост не проверяется, или None"""
+        with self._lock:
+            next_check = self._hosts.get(host.lower(), {}).get('next_check')
+        if next_check and next_check > time.time():
+            return next_check
+        return None
+
+    def save(self):
+        """Запись сведений на диск"""
+        with self._lock:
+            data = {'hosts': self._hosts, 'redirects': self._redirects}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
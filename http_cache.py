@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Заголовки ответа, которые сохраняются вместе с телом
+STORED_HEADERS = ['ETag', 'Last-Modified', 'Content-Type']
+
+
+class CacheMissError(Exception):
+    """Страницы нет в кэше (в автономном режиме)"""
+
+
+def normalize_cache_url(url):
+    """Нормализация URL для ключа кэша"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+class ResponseCache:
+    """Дисковый кэш ответов с условной перепроверкой и ограничением размера
+
+    Для каждого URL хранятся два файла: тело ответа (<ключ>.body) и метаданные
+    (<ключ>.json). При превышении max_bytes удаляются записи, к которым дольше
+    всего не обращались.
+    """
+
+    def __init__(self, cache_dir, max_bytes=1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Размеры записей по ключам в порядке обращения (в начале - самые давние).
+        # Порядок восстанавливается по времени изменения метаданных один раз при запуске
+        entries = []
+        for name in os.listdir(cache_dir):
+            if name.endswith('.body'):
+                key = name[:-len('.body')]
+                body_path, meta_path = self._paths(key)
+                try:
+                    size = os.path.getsize(body_path)
+                except OSError:
+                    continue
+                try:
+                    last_access = os.path.getmtime(meta_path)
+                except OSError:
+                    last_access = 0
+                entries.append((last_access, key, size))
+        entries.sort()
+        self._sizes = OrderedDict((key, size) for _, key, size in entries)
+        self._total = sum(self._sizes.values())
+
+    def _key(self, url):
+        return hashlib.sha256(normalize_cache_url(url).encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.body', base + '.json'
+
+    def get(self, url):
+        """Сохраненная запись (метаданные, тело) или None"""
+        key = self._key(url)
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        # Порядок обращений используется при вытеснении; время изменения файла
+        # сохраняет его до следующего запуска
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return meta, body
+
+    def put(self, url, final_url, status_code, headers, body, truncated=False):
+        """Сохранение ответа в кэш"""
+        key = self._key(url)
+        body_path, meta_path = self._paths(key)
+        meta = {
+            'url': url,
+            'final_url': final_url,
+            'status_code': status_code,
+            'headers': {name: headers[name] for name in STORED_HEADERS if name in headers},
+            'truncated': truncated,
+            'stored_at': time.time(),
+        }
+
+        # Запись через временные файлы, чтобы не оставить поврежденную запись
+        suffix = f".{threading.get_ident()}.tmp"
+        with open(body_path + suffix, 'wb') as f:
+            f.write(body)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        with self._lock:
+            os.replace(body_path + suffix, body_path)
+            os.replace(meta_path + suffix, meta_path)
+
+            self._total += len(body) - self._sizes.get(key, 0)
+            self._sizes[key] = len(body)
+            self._sizes.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        """Удаление давно не использованных записей сверх лимита (вызывается под блокировкой)"""
+        while self._total > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total -= size
+            logger.debug(f"Запись {key} вытеснена из кэша")
+
+    @staticmethod
+    def conditional_headers(meta):
+        """Заголовки условного запроса для перепроверки записи"""
+        headers = {}
+        stored = meta.get('headers', {})
+        if stored.get('ETag'):
+            headers['If-None-Match'] = stored['ETag']
+        if stored.get('Last-Modified'):
+            headers['If-Modified-Since'] = stored['Last-Modified']
+        return headers
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class KeywordMatcher:
+    """Таблица ключевых слов по категориям, подготавливаемая один раз
+
+    Ключевые слова, общие для нескольких категорий, хранятся один раз, поэтому
+    каждое слово ищется в тексте не более одного раза за все проверки. Поиск
+    выполняется встроенным поиском подстроки: в CPython он заметно быстрее
+    объединенного регулярного выражения (см. benchmarks/bench_keywords.py).
+    """
+
+    def __init__(self, groups):
+        self.groups = {category: tuple(dict.fromkeys(keywords)) for category, keywords in groups.items()}
+
+        # Категории, к которым относится каждое ключевое слово
+        self.categories = {}
+        for category, keywords in self.groups.items():
+            for keyword in keywords:
+                self.categories.setdefault(keyword, set()).add(category)
+
+    def scan(self, text):
+        """Результат поиска по тексту; категории вычисляются по мере обращения"""
+        return KeywordMatches(self, text)
+
+    def match(self, text):
+        """Все найденные ключевые слова, сгруппированные по категориям"""
+        matches = self.scan(text)
+        return {category: matches.found(category) for category in self.groups}
+
+
+class KeywordMatches:
+    """Найденные в тексте ключевые слова с кэшем по каждому слову"""
+
+    def __init__(self, matcher, text):
+        self.matcher = matcher
+        self.text = text
+        self._cache = {}
+
+    def _contains(self, keyword):
+        """Есть ли слово в тексте (каждое слово ищется один раз)"""
+        found = self._cache.get(keyword)
+        if found is None:
+            found = keyword in self.text
+            self._cache[keyword] = found
+        return found
+
+    def any(self, category):
+        """Есть ли в тексте хотя бы одно слово категории"""
+        return any(self._contains(keyword) for keyword in self.matcher.groups[category])
+
+    def count(self, category, limit=None):
+        """Число разных слов категории в тексте (поиск прекращается на limit)"""
+        found = 0
+        for keyword in self.matcher.groups[category]:
+            if self._contains(keyword):
+                found += 1
+                if limit is not None and found >= limit:
+                    break
+        return found
+
+    def found(self, category):
+        """Множество слов категории, найденных в тексте"""
+        return {keyword for keyword in self.matcher.groups[category] if self._contains(keyword)}
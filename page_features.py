@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+# Максимальная длина сохраняемого текста страницы (в символах),
+# чтобы многомегабайтные страницы не раздували память
+MAX_TEXT_CHARS = 2000000
+
+# Элементы, которые могут быть всплывающими окнами
+POPUP_SELECTORS = [
+    '.popup', '.modal', '.overlay', '.cookie', '.notification',
+    '[class*="popup"]', '[class*="modal"]', '[class*="cookie"]'
+]
+
+
+def _lower_text(element):
+    """Текст элемента в нижнем регистре с ограничением длины"""
+    return element.get_text()[:MAX_TEXT_CHARS].lower()
+
+
+# Элементы, через которые загружаются сторонние ресурсы помимо скриптов
+EMBED_TAGS = ['iframe', 'img', 'embed']
+
+
+# Все группы признаков; проверки объявляют нужные им в check_registry.py
+ALL_FEATURES = ('text', 'links', 'scripts', 'forms', 'popups')
+
+
+class PageFeatures:
+    """Признаки страницы, извлекаемые из DOM за один раз для всех проверок
+
+    Извлекаются только запрошенные группы признаков; остальные остаются пустыми.
+    """
+
+    def __init__(self, soup, url='', features=ALL_FEATURES):
+        self.url = url
+        self._page_keywords = None
+        self._third_party_services = None
+
+        # Полный текст страницы
+        self.text = _lower_text(soup) if 'text' in features else ''
+
+        # Ссылки: (текст ссылки, href в нижнем регистре, исходный href)
+        self.links = []
+        if 'links' in features:
+            self.links = [
+                (_lower_text(link), link.get('href', '').lower(), link.get('href', ''))
+                for link in soup.find_all('a', href=True)
+            ]
+
+        # Адреса внешних скриптов, код встроенных скриптов и адреса фреймов и изображений
+        # (счетчики и пиксели сторонних сервисов)
+        self.script_srcs = []
+        self.inline_scripts = []
+        self.embed_srcs = []
+        if 'scripts' in features:
+            for script in soup.find_all('script'):
+                src = script.get('src')
+                if src:
+                    self.script_srcs.append(src.lower())
+                elif script.string:
+                    self.inline_scripts.append(str(script.string)[:MAX_TEXT_CHARS])
+            self.embed_srcs = [
+                element.get('src', '').lower() for element in soup.find_all(EMBED_TAGS, src=True)
+            ]
+
+        # Поля форм с подписями и окружающим текстом
+        self.forms = FormModel(soup) if 'forms' in features else FormModel(None)
+
+        # Тексты элементов-кандидатов во всплывающие окна
+        self.popup_texts = []
+        if 'popups' in features:
+            for selector in POPUP_SELECTORS:
+                for element in soup.select(selector):
+                    self.popup_texts.append(_lower_text(element))
+
+    @classmethod
+    def merged(cls, pages):
+        """Признаки сайта, объединенные по нескольким страницам (адрес - первой страницы)"""
+        merged = cls.__new__(cls)
+        merged.url = pages[0].url
+        merged._page_keywords = None
+        merged._third_party_services = None
+        # Страницы разделяются переводом строки, чтобы ключевые слова не склеивались на границе
+        merged.text = '\n'.join(page.text for page in pages)
+        merged.links = [link for page in pages for link in page.links]
+        merged.script_srcs = [src for page in pages for src in page.script_srcs]
+        merged.inline_scripts = [code for page in pages for code in page.inline_scripts]
+        merged.embed_srcs = [src for page in pages for src in page.embed_srcs]
+        merged.forms = FormModel.merged([page.forms for page in pages])
+        merged.popup_texts = [text for page in pages for text in page.popup_texts]
+        return merged
+
+    def page_keywords(self, matcher):
+        """Ключевые слова в тексте страницы (общий кэш для всех проверок)"""
+        if self._page_keywords is None:
+            self._page_keywords = matcher.scan(self.text)
+        return self._page_keywords
+
+    def third_party_services(self, index):
+        """Сторонние сервисы страницы (общий кэш для проверок и результата)"""
+        if self._third_party_services is None:
+            self._third_party_services = index.detect(self)
+        return self._third_party_services
+
+
+# Поле формы:
+#   tag      - имя тега (input, div, label)
+#   type     - значение атрибута type
+#   checked  - отмечено ли поле по умолчанию
+#   contexts - индексы текстов FormModel.texts рядом с полем
+FormField = namedtuple('FormField', ['tag', 'type', 'checked', 'contexts'])
+
+
+class FormModel:
+    """Индекс полей форм страницы
+
+    Каждое поле встречается один раз. Окружающий текст поля - текст родителя,
+    следующего соседнего элемента и подписей <label for>. Текст каждого узла
+    вычисляется один раз, даже если у многих полей общий родитель (например,
+    <form> или <body>), поэтому разбор больших форм не становится квадратичным.
+    """
+
+    def __init__(self, soup):
+        self.fields = []
+        # Различные тексты рядом с полями (в нижнем регистре)
+        self.texts = []
+        self._text_index = {}
+        self._node_text = {}
+        if soup is None:
+            return
+
+        # Подписи <label for="id"> по идентификатору поля
+        labels = {}
+        for label in soup.find_all('label', attrs={'for': True}):
+            labels.setdefault(label['for'], []).append(label)
+
+        elements = soup.find_all(['input', 'div', 'label'], {'type': 'checkbox'}) + soup.find_all('input')
+        seen = set()
+        for element in elements:
+            if id(element) in seen:
+                continue
+            seen.add(id(element))
+
+            context_nodes = [element.parent, element.find_next_sibling()]
+            context_nodes.extend(labels.get(element.get('id'), []))
+            contexts = tuple(dict.fromkeys(
+                self._context_index(node) for node in context_nodes if node is not None
+            ))
+            self.fields.append(FormField(element.name, element.get('type'),
+                                         bool(element.get('checked')), contexts))
+
+    @classmethod
+    def merged(cls, models):
+        """Объединение полей форм нескольких страниц"""
+        merged = cls(None)
+        for model in models:
+            offset = len(merged.texts)
+            merged.texts.extend(model.texts)
+            merged.fields.extend(
+                field._replace(contexts=tuple(index + offset for index in field.contexts))
+                for field in model.fields
+            )
+        return merged
+
+    def _context_index(self, node):
+        """Индекс текста узла в self.texts (текст узла вычисляется один раз)"""
+        index = self._node_text.get(id(node))
+        if index is None:
+            text = _lower_text(node)
+            index = self._text_index.setdefault(text, len(self.texts))
+            if index == len(self.texts):
+                self.texts.append(text)
+            self._node_text[id(node)] = index
+        return index
+
+    def checkboxes(self):
+        """Поля <input type="checkbox">"""
+        return [field for field in self.fields if field.tag == 'input' and field.type == 'checkbox']
@@ -1,20 +1,12 @@
-import json
+from site_source import iter_json_sites, unique_sites
 
-# Чтение JSON файла
-with open('sites.json', 'r', encoding='utf-8') as file:
-    data = json.load(file)  # data - это список
-
-# Извлечение всех ссылок из поля "Боевой сайт"
-battle_sites = []
-for item in data:
-    if isinstance(item, dict):  # Проверяем, что элемент является словарем
-        url = item.get("Боевой сайт", "")
-        if url:  # Если ссылка не пустая
-            battle_sites.append(url)
-
-# Запись ссылок в текстовый файл
+# Потоковое чтение выгрузки реестра: ссылки из поля "Боевой сайт" без повторов
+# (адреса, отличающиеся только схемой, www или завершающим '/', считаются одним сайтом).
+# Ссылки записываются в текстовый файл по мере чтения
+count = 0
 with open('battle_sites.txt', 'w', encoding='utf-8') as output_file:
-    for url in battle_sites:
+    for url in unique_sites(iter_json_sites('sites.json')):
         output_file.write(url + '\n')
+        count += 1
 
-print(f"Успешно записано {len(battle_sites)} ссылок в battle_sites.txt")
\ No newline at end of file
+print(f"Успешно записано {count} ссылок в battle_sites.txt")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+import threading
+
+# Файл результатов по умолчанию: одна строка JSON на сайт
+DEFAULT_RESULTS_FILE = 'results.jsonl'
+
+
+class ResultWriter:
+    """Потоковая запись результатов: каждый сайт дописывается сразу после проверки"""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            _drop_incomplete_tail(path)
+            self._file = open(path, 'a', encoding='utf-8')
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, site, index, result):
+        """Запись результата одного сайта; index - позиция сайта во входном списке"""
+        record = dict(result, site=site, index=index)
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _drop_incomplete_tail(path):
+    """Удаление недописанной последней строки (после аварийного завершения)"""
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+
+        # Поиск последнего перевода строки с конца файла
+        position = size
+        while position > 0:
+            step = min(64 * 1024, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+def read_results(path):
+    """Построчное чтение результатов из файла JSONL"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_results_with_offsets(path, complete_only=False):
+    """Построчное чтение результатов вместе со смещением строки в файле
+
+    complete_only - пропустить недописанную последнюю строку (без перевода строки),
+    не изменяя файл.
+    """
+    with open(path, 'rb') as f:
+        offset = 0
+        for line in f:
+            if complete_only and not line.endswith(b'\n'):
+                break
+            if line.strip():
+                yield offset, json.loads(line)
+            offset += len(line)
+
+
+def read_result_at(f, offset):
+    """Чтение одного результата по смещению в открытом (в двоичном режиме) файле"""
+    f.seek(offset)
+    return json.loads(f.readline())
+
+
+def completed_sites(path):
+    """Сайты, результаты которых уже есть в файле"""
+    if not os.path.exists(path):
+        return set()
+    _drop_incomplete_tail(path)
+    return {record['site'] for record in read_results(path)}
+
+
+def compliance(checks):
+    """Число выполненных проверок, всего проверок и процент соответствия"""
+    passed = sum(1 for check in checks.values() if check)
+    total = len(checks)
+    return passed, total, (passed / total * 100) if total else 0.0
+
+
+def merge_results(paths, output_path):
+    """Объединение файлов результатов (например, частей, проверенных на разных машинах)
+
+    Записи выводятся в порядке номеров сайтов; если сайт встречается в нескольких
+    файлах, остается запись из последнего. Входные файлы не изменяются, поэтому
+    выходной файл может быть одним из них: он заменяется только после записи
+    во временный файл. Возвращает число записей.
+    """
+    latest = {}
+    for file_number, path in enumerate(paths):
+        for offset, record in read_results_with_offsets(path, complete_only=True):
+            latest[record['site']] = (record.get('index', 0), file_number, offset)
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.merge-', suffix='.jsonl', dir=output_dir)
+    sources = [open(path, 'rb') for path in paths]
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as output:
+            for _, file_number, offset in sorted(latest.values()):
+                record = read_result_at(sources[file_number], offset)
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        # mkstemp создает файл только для владельца; права берутся как у обычного файла
+        os.chmod(temp_path, os.stat(output_path).st_mode if os.path.exists(output_path) else 0o644)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    finally:
+        for source in sources:
+            source.close()
+    return len(latest)
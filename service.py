@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Режим службы: проверка сайтов по запросу через локальный HTTP API
+
+SiteChecker создается один раз при запуске: сессия с пулом соединений, кэши,
+таблицы ключевых слов и индекс сторонних сервисов сохраняются между запросами.
+Задания ставятся в ограниченную очередь и выполняются пулом потоков.
+
+API (тело запросов и ответов - JSON):
+    POST /check    {"url": "..."} или {"urls": [...]} - проверить и дождаться результата
+    POST /jobs     то же без ожидания: ответ 202 с номером задания
+    GET  /jobs/ID  состояние и результаты задания
+    GET  /health   время запуска, заполнение очереди, задержки проверок
+
+Использование:
+    python3 service.py --port 8080 --workers 4
+    python3 service.py --unix-socket /run/check_sites.sock
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+
+from check_sites import add_checker_arguments, create_checker
+from timings import percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+# Максимум сайтов, ожидающих проверки во всех заданиях
+DEFAULT_QUEUE_SIZE = 100
+# Сколько секунд POST /check ждет результата, прежде чем вернуть номер задания
+DEFAULT_WAIT_TIMEOUT = 60.0
+# Сколько завершенных заданий хранится для GET /jobs/ID
+KEEP_JOBS = 1000
+# Число последних проверок для статистики задержек
+LATENCY_WINDOW = 1000
+# Максимальный размер тела запроса, байт
+MAX_REQUEST_BYTES = 1024 * 1024
+
+# Страница для прогрева: загрузка парсера и первый прогон проверок при запуске
+WARMUP_PAGE = (b'<html><head><title>warmup</title></head><body>'
+               b'<form><input type="checkbox" name="consent"></form>'
+               b'<a href="/privacy">privacy</a></body></html>')
+
+
+class QueueFullError(Exception):
+    """Очередь проверок заполнена"""
+
+
+class BatchTooLargeError(Exception):
+    """Задание больше всей очереди и не может быть принято никогда"""
+
+
+class Job:
+    """Задание: один или несколько сайтов, результаты в порядке адресов"""
+
+    def __init__(self, job_id, urls):
+        self.id = job_id
+        self.urls = urls
+        self.results = [None] * len(urls)
+        self.created = time.perf_counter()
+        self.created_at = time.time()
+        self.elapsed = None
+        self.done = threading.Event()
+        self._remaining = len(urls)
+        self._lock = threading.Lock()
+
+    def complete(self, position, result):
+        """Сохранение результата сайта; задание завершается с последним результатом"""
+        with self._lock:
+            self.results[position] = result
+            self._remaining -= 1
+            finished = self._remaining == 0
+        if finished:
+            self.elapsed = time.perf_counter() - self.created
+            self.done.set()
+
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'status': 'done' if self.done.is_set() else 'pending',
+            'created_at': self.created_at,
+            'sites': len(self.urls),
+        }
+        if self.done.is_set():
+            data['elapsed'] = round(self.elapsed, 4)
+            data['results'] = self.results
+        else:
+            data['completed'] = sum(1 for result in self.results if result is not None)
+        return data
+
+
+class CheckService:
+    """Очередь заданий и пул потоков вокруг одного SiteChecker"""
+
+    def __init__(self, checker, workers=1, queue_size=DEFAULT_QUEUE_SIZE, keep_jobs=KEEP_JOBS):
+        self.checker = checker
+        self.queue_size = queue_size
+        self.keep_jobs = keep_jobs
+        self.started_at = time.time()
+        self.startup_seconds = None
+        self._queue = queue.Queue()
+        # Число сайтов в очереди и в работе; ограничивается queue_size
+        self._pending = 0
+        self._completed = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._jobs = OrderedDict()
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._worker, name=f'check-{i}', daemon=True)
+                         for i in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def warm_up(self):
+        """Прогрев: разбор и проверки тестовой страницы до приема запросов"""
+        self.checker.analyze_page(WARMUP_PAGE, 'http://localhost/')
+
+    def submit(self, urls):
+        """Постановка сайтов в очередь
+
+        BatchTooLargeError - задание больше размера очереди; QueueFullError - все
+        сайты задания сейчас не помещаются в очередь (можно повторить позже).
+        """
+        if len(urls) > self.queue_size:
+            raise BatchTooLargeError(f"В задании {len(urls)} сайтов, максимум {self.queue_size}")
+        with self._lock:
+            if self._pending + len(urls) > self.queue_size:
+                raise QueueFullError(f"Очередь заполнена: {self._pending} из {self.queue_size}")
+            self._pending += len(urls)
+            job = Job(next(self._job_ids), urls)
+            self._jobs[job.id] = job
+            # Старые завершенные задания удаляются; незавершенные остаются до выполнения
+            while len(self._jobs) > self.keep_jobs:
+                oldest = next(iter(self._jobs.values()))
+                if not oldest.done.is_set():
+                    break
+                self._jobs.popitem(last=False)
+        for position, url in enumerate(urls):
+            self._queue.put((job, position, url))
+        return job
+
+    def job(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job, position, url = item
+            started = time.perf_counter()
+            try:
+                result = self.checker.check_site(url)
+            except Exception as e:
+                logger.exception(f"Ошибка проверки {url}")
+                result = {'url': url, 'accessible': False, 'checks': {}, 'errors': [str(e)]}
+            finished = time.perf_counter()
+            result['latency'] = {'queued': round(started - job.created, 4),
+                                 'check': round(finished - started, 4)}
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._latencies.append(finished - started)
+            job.complete(position, result)
+
+    def stats(self):
+        """Состояние службы для GET /health"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending = self._pending
+            completed = self._completed
+        return {
+            'status': 'ok',
+            'uptime': round(time.time() - self.started_at, 1),
+            'startup_seconds': self.startup_seconds,
+            'workers': len(self._threads),
+            'pending': pending,
+            'queue_size': self.queue_size,
+            'completed': completed,
+            'latency': {
+                'count': len(latencies),
+                'p50': round(percentile(latencies, 0.5), 4),
+                'p95': round(percentile(latencies, 0.95), 4),
+                'max': round(latencies[-1], 4) if latencies else 0.0,
+            },
+        }
+
+    def close(self):
+        """Остановка потоков после выполнения очереди и закрытие SiteChecker"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.checker.close()
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """Обработчик HTTP API; служба и таймаут ожидания берутся из сервера"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, self.server.service.stats())
+        elif self.path.startswith('/jobs/'):
+            try:
+                job = self.server.service.job(int(self.path[len('/jobs/'):]))
+            except ValueError:
+                job = None
+            if job is None:
+                self.send_json(404, {'error': 'Задание не найдено'})
+            else:
+                self.send_json(200, job.to_dict())
+        else:
+            self.send_json(404, {'error': 'Неизвестный адрес'})
+
+    def do_POST(self):
+        if self.path not in ('/check', '/jobs'):
+            # Тело запроса не читалось, соединение дальше использовать нельзя
+            self.close_connection = True
+            self.send_json(404, {'error': 'Неизвестный адрес'})
+            return
+        started = time.perf_counter()
+        try:
+            urls = self.read_urls()
+        except ValueError as e:
+            self.close_connection = True
+            self.send_json(400, {'error': str(e)})
+            return
+
+        try:
+            job = self.server.service.submit(urls)
+        except BatchTooLargeError as e:
+            self.send_json(413, {'error': str(e)})
+            return
+        except QueueFullError as e:
+            self.send_json(503, {'error': str(e)}, {'Retry-After': '5'})
+            return
+
+        if self.path == '/jobs' or not job.done.wait(self.server.wait_timeout):
+            self.send_json(202, {'id': job.id, 'status': 'pending'}, {'Location': f'/jobs/{job.id}'})
+            return
+        data = job.to_dict()
+        data['latency'] = round(time.perf_counter() - started, 4)
+        self.send_json(200, data)
+
+    def read_urls(self):
+        """Адреса из тела запроса: {"url": "..."} или {"urls": [...]}"""
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            raise ValueError(f"Нужно тело запроса JSON размером до {MAX_REQUEST_BYTES} байт")
+        try:
+            body = json.loads(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ValueError("Тело запроса не является JSON")
+        if not isinstance(body, dict):
+            raise ValueError("Ожидается объект с полем url или urls")
+        urls = body.get('urls', [body['url']] if 'url' in body else None)
+        if not isinstance(urls, list) or not urls:
+            raise ValueError("Ожидается объект с полем url или непустым списком urls")
+        if not all(isinstance(url, str) and url.strip() for url in urls):
+            raise ValueError("Адреса сайтов должны быть непустыми строками")
+        return [url.strip() for url in urls]
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # У соединений через Unix-сокет нет адреса клиента
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """HTTP-сервер на Unix-сокете"""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        # Сокет, оставшийся от предыдущего запуска, удаляется
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def create_server(service, args):
+    """HTTP-сервер на TCP-порту или Unix-сокете"""
+    if args.unix_socket:
+        server = ThreadingUnixHTTPServer(args.unix_socket, ServiceRequestHandler)
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), ServiceRequestHandler)
+    server.service = service
+    server.wait_timeout = args.wait_timeout
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Служба проверки сайтов по запросу (HTTP API)')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help=f'адрес для приема запросов (по умолчанию {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'порт (по умолчанию {DEFAULT_PORT})')
+    parser.add_argument('--unix-socket',
+                        help='принимать запросы на Unix-сокете вместо TCP-порта')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f'максимум сайтов в очереди (по умолчанию {DEFAULT_QUEUE_SIZE})')
+    parser.add_argument('--wait-timeout', type=float, default=DEFAULT_WAIT_TIMEOUT,
+                        help=f'сколько POST /check ждет результата, сек (по умолчанию {DEFAULT_WAIT_TIMEOUT:g})')
+    add_checker_arguments(parser)
+    args = parser.parse_args()
+    if args.offline and not args.cache_dir:
+        parser.error('для --offline нужно указать --cache-dir')
+    return args
+
+
+def main():
+    args = parse_args()
+
+    # Вся подготовительная работа выполняется один раз при запуске
+    started = time.perf_counter()
+    service = CheckService(create_checker(args), args.workers, args.queue_size)
+    service.warm_up()
+    service.startup_seconds = round(time.perf_counter() - started, 3)
+
+    server = create_server(service, args)
+    address = args.unix_socket or f"http://{args.host}:{server.server_address[1]}"
+    logger.info(f"Служба запущена за {service.startup_seconds:.2f} с: {address}, потоков: {args.workers}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Остановка службы")
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+from urllib.parse import urlsplit
+
+# Поле выгрузки реестра с адресом сайта
+SITE_FIELD = 'Боевой сайт'
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(f, chunk_size=CHUNK_SIZE):
+    """Потоковый разбор JSON-массива верхнего уровня: элементы по одному
+
+    Файл читается частями, в памяти одновременно находится только текущая
+    часть и разбираемый элемент.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+
+    def read_more():
+        nonlocal buffer, position, eof
+        chunk = f.read(chunk_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        eof = not chunk
+
+    while True:
+        # Пропуск пробелов и разделителей между элементами
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            read_more()
+        if position >= len(buffer):
+            if started:
+                raise ValueError("Неожиданный конец JSON-массива")
+            return
+
+        if not started:
+            if buffer[position] != '[':
+                raise ValueError("Ожидался JSON-массив")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()
+            continue
+        # Число на границе части могло быть прочитано не полностью (1. + 5 из 1.5):
+        # элемент принимается, только если за ним виден разделитель
+        if not eof and (end == len(buffer) or buffer[end] not in ' \t\r\n,]'):
+            read_more()
+            continue
+        position = end
+        yield item
+
+
+def iter_json_sites(path, field=SITE_FIELD):
+    """Адреса сайтов из выгрузки реестра (JSON-массив объектов)"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for item in iter_json_array(f):
+            if isinstance(item, dict):
+                url = item.get(field, "")
+                if isinstance(url, str) and url.strip():
+                    yield url.strip()
+
+
+def iter_sites_file(path):
+    """Адреса сайтов из текстового файла: по одному в строке, строки с '-' пропускаются"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('-'):
+                yield line
+
+
+def iter_sites(path):
+    """Адреса сайтов из файла списка или выгрузки реестра (.json)"""
+    if path.lower().endswith('.json'):
+        return iter_json_sites(path)
+    return iter_sites_file(path)
+
+
+def site_key(url):
+    """Ключ сайта для поиска повторов: хост без www, путь без завершающего '/' и запрос
+
+    Схема не учитывается: http://example.ru и https://example.ru - один сайт.
+    Для некорректного адреса (неверный порт, незакрытая скобка IPv6) ключом
+    служит сама строка: ошибка такого сайта попадет в его результат.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url if '://' in url else '//' + url)
+        port = parts.port
+    except ValueError:
+        return url
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    port = f":{port}" if port and port not in (80, 443) else ''
+    key = host + port + parts.path.rstrip('/')
+    return f"{key}?{parts.query}" if parts.query else key
+
+
+def unique_sites(urls):
+    """Адреса без повторов (по site_key); остается первое написание"""
+    seen = set()
+    for url in urls:
+        key = site_key(url)
+        if key not in seen:
+            seen.add(key)
+            yield url
+
+
+def shard_of(url, count):
+    """Номер части (0..count-1) для сайта; все адреса одного хоста попадают в одну часть"""
+    host = site_key(url).split('/', 1)[0].split('?', 1)[0]
+    digest = hashlib.sha1(host.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+def parse_shard(value):
+    """Разбор обозначения части вида i/N (i от 1 до N)"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Неверное обозначение части: {value} (ожидается i/N)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Неверное обозначение части: {value} (должно быть 1 <= i <= N)")
+    return index - 1, count
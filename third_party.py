@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# Сигнатуры сторонних сервисов:
+#   domains - домены сервиса; совпадает сам домен и все его поддомены
+#   calls   - функции, вызов которых во встроенном скрипте выдает сервис (gtag(...))
+#   globals - идентификаторы встроенного скрипта (цифры в конце не учитываются: yaCounter123)
+SIGNATURES = {
+    'Google Analytics': {
+        'domains': ['google-analytics.com', 'analytics.google.com'],
+        'calls': ['gtag', 'ga'],
+        'globals': ['GoogleAnalyticsObject'],
+    },
+    'Google Tag Manager': {
+        'domains': ['googletagmanager.com'],
+        'globals': ['dataLayer'],
+    },
+    'Google Ads': {
+        'domains': ['googleadservices.com', 'googlesyndication.com', 'doubleclick.net'],
+    },
+    'Google reCAPTCHA': {
+        'domains': ['recaptcha.net'],
+        'globals': ['grecaptcha'],
+    },
+    'Google Maps': {
+        'domains': ['maps.googleapis.com', 'maps.google.com', 'maps.google.ru'],
+    },
+    'Google Fonts': {
+        'domains': ['fonts.googleapis.com', 'fonts.gstatic.com'],
+    },
+    'YouTube': {
+        'domains': ['youtube.com', 'youtube-nocookie.com', 'ytimg.com', 'youtu.be'],
+    },
+    'Яндекс.Метрика': {
+        'domains': ['mc.yandex.ru', 'mc.yandex.com', 'mc.yandex.by', 'mc.yandex.kz', 'mc.webvisor.org',
+                    'metrika.yandex.ru'],
+        'calls': ['ym'],
+        'globals': ['yaCounter', 'yandex_metrika_callbacks', 'yandex_metrika_callbacks2'],
+    },
+    'Яндекс.Карты': {
+        'domains': ['api-maps.yandex.ru', 'yandex.ru/map-widget'],
+        'globals': ['ymaps'],
+    },
+    'Яндекс.Директ': {
+        'domains': ['an.yandex.ru', 'yandex.ru/ads'],
+        'globals': ['yaContextCb'],
+    },
+    'Facebook Pixel': {
+        'domains': ['connect.facebook.net', 'facebook.com', 'facebook.net'],
+        'calls': ['fbq'],
+    },
+    'VK': {
+        'domains': ['vk.com', 'vk.ru', 'userapi.com', 'vk-portal.net'],
+        'globals': ['VK.Retargeting', 'VK.Widgets'],
+    },
+    'Top@Mail.ru': {
+        'domains': ['top-fwz1.mail.ru', 'top.mail.ru'],
+        'globals': ['_tmr'],
+    },
+    'LiveInternet': {
+        'domains': ['counter.yadro.ru', 'liveinternet.ru'],
+    },
+    'Twitter': {
+        'domains': ['platform.twitter.com', 'ads-twitter.com', 'analytics.twitter.com'],
+        'calls': ['twq'],
+    },
+    'TikTok Pixel': {
+        'domains': ['analytics.tiktok.com'],
+        'globals': ['ttq'],
+    },
+    'Hotjar': {
+        'domains': ['hotjar.com', 'hotjar.io'],
+        'calls': ['hj'],
+    },
+    'Jivo': {
+        'domains': ['jivosite.com', 'jivo.ru', 'jivosite.ru'],
+        'globals': ['jivo_api', 'jivo_config'],
+    },
+    'Битрикс24': {
+        'domains': ['bitrix24.ru', 'bitrix24.com', 'bitrix24.by', 'bitrix24.kz'],
+        'globals': ['b24form'],
+    },
+    'Calltouch': {
+        'domains': ['calltouch.ru'],
+        'globals': ['ct_get_session_id', 'calltouch'],
+    },
+    'Roistat': {
+        'domains': ['roistat.com'],
+        'globals': ['roistat', 'roistatProjectId'],
+    },
+    'Carrot quest': {
+        'domains': ['carrotquest.io', 'carrotquest.app'],
+        'globals': ['carrotquest'],
+    },
+    'Cloudflare Web Analytics': {
+        'domains': ['cloudflareinsights.com'],
+    },
+}
+
+# Идентификатор встроенного скрипта (с точками: VK.Retargeting) и признак вызова
+IDENTIFIER_PATTERN = re.compile(r'([A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*)(\s*\()?')
+
+# Адреса внутри встроенных скриптов (подгрузка скрипта сервиса из кода)
+URL_HOST_PATTERN = re.compile(r'//([a-z0-9-]+(?:\.[a-z0-9-]+)+)(/[^\s\'"]*)?', re.IGNORECASE)
+
+
+class ThirdPartyIndex:
+    """Индекс сигнатур сторонних сервисов
+
+    Домены хранятся в префиксном дереве по меткам домена справа налево
+    (ru -> yandex -> mc), поэтому поиск хоста стоит столько шагов, сколько в нем
+    меток, а не сколько сигнатур. Встроенные скрипты разбиваются на
+    идентификаторы за один проход, каждый идентификатор ищется в словаре.
+    Результаты поиска хостов кэшируются.
+    """
+
+    def __init__(self, signatures=SIGNATURES, cache_size=65536):
+        self._domains = {}
+        self._calls = {}
+        self._globals = {}
+        for service, signature in signatures.items():
+            for domain in signature.get('domains', []):
+                self._add_domain(domain, service)
+            for name in signature.get('calls', []):
+                self._calls[name] = service
+            for name in signature.get('globals', []):
+                self._globals[name] = service
+        self.lookup_host = lru_cache(maxsize=cache_size)(self._lookup_host)
+
+    def _add_domain(self, domain, service):
+        """Добавление домена (возможно, с первым сегментом пути: yandex.ru/ads)"""
+        host, _, path = domain.partition('/')
+        node = self._domains
+        for label in reversed(host.split('.')):
+            node = node.setdefault(label, {})
+        if path:
+            node.setdefault('/', {})[path] = service
+        else:
+            node[''] = service
+
+    def _lookup_host(self, host, first_segment=''):
+        """Сервис по хосту (самый длинный совпавший суффикс домена) или None"""
+        node = self._domains
+        found = None
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get('', found)
+        else:
+            # Домен с путем (yandex.ru/ads) совпадает только с самим хостом
+            if first_segment and '/' in node:
+                found = node['/'].get(first_segment, found)
+        return found
+
+    def lookup_url(self, url):
+        """Сервис по адресу ресурса; относительные адреса не проверяются"""
+        if '//' not in url:
+            return None
+        try:
+            parts = urlsplit(url.strip())
+            host = parts.hostname
+        except ValueError:
+            return None
+        if not host:
+            return None
+        return self.lookup_host(host, parts.path.lstrip('/').split('/', 1)[0])
+
+    def scan_inline(self, code):
+        """Сервисы, найденные во встроенном скрипте"""
+        services = set()
+        for match in IDENTIFIER_PATTERN.finditer(code):
+            name = match.group(1).rstrip('0123456789')
+            if match.group(2) and name in self._calls:
+                services.add(self._calls[name])
+            # Для составных имен проверяется и полное имя, и первая часть (ttq.load -> ttq)
+            head = name.split('.', 1)[0].rstrip('0123456789')
+            service = self._globals.get(name) or self._globals.get(head)
+            if service:
+                services.add(service)
+        for match in URL_HOST_PATTERN.finditer(code):
+            path = (match.group(2) or '').lstrip('/').split('/', 1)[0]
+            service = self.lookup_host(match.group(1).lower(), path)
+            if service:
+                services.add(service)
+        return services
+
+    def detect(self, features):
+        """Сторонние сервисы страницы по внешним скриптам, встроенному коду, фреймам и изображениям"""
+        services = set()
+        for src in features.script_srcs:
+            service = self.lookup_url(src)
+            if service:
+                services.add(service)
+        for src in features.embed_srcs:
+            service = self.lookup_url(src)
+            if service:
+                services.add(service)
+        for code in features.inline_scripts:
+            services.update(self.scan_inline(code))
+        return sorted(services)
+
+
+# Индекс строится один раз при загрузке модуля (в каждом процессе-обработчике - при его запуске)
+THIRD_PARTY_INDEX = ThirdPartyIndex()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Этапы проверки сайта в порядке вывода в отчетах:
+#   total          - вся проверка сайта
+#   dns            - разрешение имен (измеряется при включенном кэше DNS)
+#   connect        - установка TCP-соединения
+#   tls            - TLS-рукопожатие
+#   wait           - ожидание заголовков ответа (включая перенаправления и повторы)
+#   body           - чтение тела ответа
+#   download       - загрузка главной страницы целиком
+#   crawl_download - загрузка дополнительных страниц при обходе
+#   parse          - разбор HTML
+#   features       - извлечение признаков страницы
+#   checks         - выполнение проверок
+PHASES = ['total', 'dns', 'connect', 'tls', 'wait', 'body', 'download', 'crawl_download',
+          'parse', 'features', 'checks']
+# Этапы, не включающие друг друга
+LEAF_PHASES = ['dns', 'connect', 'tls', 'wait', 'body', 'crawl_download', 'parse', 'features', 'checks']
+
+# Время сетевых этапов копится отдельно для каждого потока
+_local = threading.local()
+
+
+def add_phase(name, seconds):
+    """Добавление времени этапа для текущего потока"""
+    phases = getattr(_local, 'phases', None)
+    if phases is None:
+        phases = _local.phases = {}
+    phases[name] = phases.get(name, 0.0) + seconds
+
+
+def phase_time(name):
+    """Накопленное в текущем потоке время этапа"""
+    return getattr(_local, 'phases', {}).get(name, 0.0)
+
+
+def take_phases():
+    """Накопленное время этапов текущего потока; накопление начинается заново"""
+    phases = getattr(_local, 'phases', None) or {}
+    _local.phases = {}
+    return phases
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        dns_before = phase_time('dns')
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            # Разрешение имени выполняется внутри и учитывается отдельно
+            add_phase('connect', time.perf_counter() - started - (phase_time('dns') - dns_before))
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        dns_before = phase_time('dns')
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            add_phase('connect', time.perf_counter() - started - (phase_time('dns') - dns_before))
+
+    def connect(self):
+        before = phase_time('dns') + phase_time('connect')
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            add_phase('tls', time.perf_counter() - started - (phase_time('dns') + phase_time('connect') - before))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Адаптер requests, замеряющий установку соединения и TLS-рукопожатие"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+def percentile(values, fraction):
+    """Перцентиль по отсортированному списку (метод ближайшего ранга)"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(values)))
+    return values[rank - 1]
+
+
+class TimingStats:
+    """Сводная статистика времени по результатам проверки
+
+    Результаты добавляются по одному (add), в памяти хранятся только значения
+    времени и несколько самых медленных сайтов.
+    """
+
+    def __init__(self, top=5):
+        self.top = top
+        self.phases = {}
+        self.checks = {}
+        self.bytes = 0
+        self._slowest = []
+        self._order = itertools.count()
+
+    def add(self, record):
+        timings = record.get('timings')
+        if not timings:
+            return
+        for name, value in timings.items():
+            if isinstance(value, float):
+                self.phases.setdefault(name, []).append(value)
+        for key, value in timings.get('by_check', {}).items():
+            self.checks.setdefault(key, []).append(value)
+        self.bytes += record.get('bytes', 0)
+
+        total = timings.get('total')
+        if total is not None:
+            entry = (total, next(self._order), record.get('site', record.get('url', '')), timings)
+            if len(self._slowest) < self.top:
+                heapq.heappush(self._slowest, entry)
+            elif total > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def write_markdown(self, f, labels, heading='##'):
+        """Раздел отчета: перцентили по этапам, самые медленные сайты и проверки"""
+        if not self.phases:
+            return
+        f.write(f"{heading} Производительность\n\n")
+        f.write(f"Загружено данных: {self.bytes / 1024 / 1024:.1f} МБ\n\n")
+
+        f.write("| Этап | Сайтов | p50, с | p95, с | Максимум, с | Всего, с |\n")
+        f.write("|------|--------|--------|--------|-------------|----------|\n")
+        names = [name for name in PHASES if name in self.phases]
+        names += sorted(name for name in self.phases if name not in PHASES)
+        for name in names:
+            values = sorted(self.phases[name])
+            f.write(f"| {name} | {len(values)} | {percentile(values, 0.5):.3f} | "
+                    f"{percentile(values, 0.95):.3f} | {values[-1]:.3f} | {sum(values):.1f} |\n")
+        f.write("\n")
+
+        if self._slowest:
+            f.write(f"{heading}# Самые медленные сайты\n\n")
+            for total, _, site, timings in sorted(self._slowest, reverse=True):
+                # Этап, занявший больше всего времени
+                phase = max((name for name in LEAF_PHASES if isinstance(timings.get(name), float)),
+                            key=lambda name: timings[name], default=None)
+                detail = f" (дольше всего: {phase} - {timings[phase]:.3f} с)" if phase else ""
+                f.write(f"- **{site}** - {total:.3f} с{detail}\n")
+            f.write("\n")
+
+        if self.checks:
+            f.write(f"{heading}# Время проверок\n\n")
+            f.write("| Проверка | p50, мс | p95, мс | Максимум, мс | Всего, с |\n")
+            f.write("|----------|---------|---------|--------------|----------|\n")
+            for key in sorted(self.checks, key=lambda key: -sum(self.checks[key])):
+                values = sorted(self.checks[key])
+                f.write(f"| {labels.get(key, key)} | {percentile(values, 0.5) * 1000:.2f} | "
+                        f"{percentile(values, 0.95) * 1000:.2f} | {values[-1] * 1000:.2f} | "
+                        f"{sum(values):.2f} |\n")
+            f.write("\n")